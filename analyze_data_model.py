@@ -5,10 +5,92 @@ Show the difference between raw chunks and aggregated sessions
 """
 
 import argparse
+import os
 import lancedb
 import duckdb
 import pandas as pd
-from datetime import datetime
+import pyarrow as pa
+
+from lance_utils import load_cols
+
+
+def has_vector_index(table, vector_column="vector"):
+    """Whether the table already has an ANN index on the vector column"""
+    return any(vector_column in index.columns for index in table.list_indices())
+
+
+def ensure_vector_index(table, vector_column="vector"):
+    """Build an ANN index on the vector column unless one already exists
+
+    This writes a new table version, so it only runs on request (--build-index).
+    Returns True when the table has a vector index after the call.
+    """
+    schema = table.schema
+    if vector_column not in schema.names:
+        return False
+
+    if has_vector_index(table, vector_column):
+        return True
+
+    row_count = table.count_rows()
+    # PQ training needs at least 256 rows; brute force is fine below that
+    if row_count < 256:
+        return False
+
+    vector_type = schema.field(vector_column).type
+    # PQ sub-vectors need a fixed dimension
+    if not pa.types.is_fixed_size_list(vector_type):
+        print(f"Warning: Could not build vector index: {vector_type} is not fixed-size")
+        return False
+
+    dimensions = vector_type.list_size
+    index_options = {
+        "metric": "cosine",
+        "vector_column_name": vector_column,
+        "num_partitions": min(256, int(row_count**0.5)),
+        "num_sub_vectors": 64 if dimensions % 64 == 0 else None,
+        "replace": False,
+    }
+    if row_count >= 1_000_000:
+        index_options.update(index_type="IVF_HNSW_PQ", m=16, ef_construction=64)
+    else:
+        index_options["index_type"] = "IVF_PQ"
+
+    try:
+        table.create_index(**index_options)
+    except (RuntimeError, ValueError) as e:
+        print(f"Warning: Could not build vector index: {e}")
+        return False
+
+    return True
+
+
+def migrate_vectors_to_float32(db, table_name, vector_column="vector"):
+    """Copy a table into <table_name>_f32 with its vectors stored as float32
+
+    Tables whose vectors are already float32 are returned unchanged.
+    Batches are cast while streaming, so the table is never fully in memory.
+    """
+    table = db.open_table(table_name)
+    vector_type = table.schema.field(vector_column).type
+    if vector_type.value_type == pa.float32():
+        return table
+
+    if pa.types.is_fixed_size_list(vector_type):
+        float32_type = pa.list_(pa.float32(), vector_type.list_size)
+    else:
+        float32_type = pa.list_(pa.float32())
+
+    source = table.to_lance()
+    target_schema = source.schema.set(
+        source.schema.get_field_index(vector_column),
+        pa.field(vector_column, float32_type),
+    )
+    reader = pa.RecordBatchReader.from_batches(
+        target_schema, (batch.cast(target_schema) for batch in source.to_batches())
+    )
+
+    return db.create_table(f"{table_name}_f32", data=reader, mode="overwrite")
 
 
 def analyze_data_model(table_name="whiskey_jack", data_dir="."):
@@ -31,30 +113,59 @@ def analyze_data_model(table_name="whiskey_jack", data_dir="."):
         )
 
     print(f"\nTotal columns: {len(schema)}")
+    if (
+        "vector" in schema.names
+        and schema.field("vector").type.value_type != pa.float32()
+    ):
+        print(
+            f"Note: vectors are stored as {schema.field('vector').type.value_type}; "
+            "run with --to-float32 to write a float32 copy"
+        )
     print(f"Total rows: {table.count_rows():,}")
+    if has_vector_index(table):
+        print("Vector index: available (approximate nearest neighbour search)")
+    else:
+        print(
+            "Vector index: none (similarity search falls back to a full scan; "
+            "run with --build-index to build one)"
+        )
 
-    # Load sample data
-    df = table.to_pandas()
+    # One DuckDB connection with the dataset registered once for every query
+    lance_data = table.to_lance()
+    con = duckdb.connect()
+    # Use every core for the GROUP BY session_id hash aggregations; none of
+    # the unordered queries depend on scan order
+    con.execute(f"SET threads = {os.cpu_count()}")
+    con.execute("SET preserve_insertion_order = false")
+    con.register("lance_data", lance_data)
 
     print("\n2. RAW DATA STRUCTURE")
     print("-" * 40)
     print("This is what you see in 'Raw Data Browser':")
     print("Each row = ONE TEXT CHUNK from a conversation")
 
-    # Show sample chunks from one session
-    sample_session = df["session_id"].iloc[0]
-    session_chunks = df[df["session_id"] == sample_session].sort_values(
-        ["timestamp", "chunk_id"]
-    )
+    # Show sample chunks from one session, reading only that session's rows.
+    # Timestamps are formatted by DuckDB in local time, like fromtimestamp().
+    (sample_session,) = con.query(
+        "SELECT session_id FROM lance_data LIMIT 1"
+    ).fetchone()
+    session_chunks_sql = """
+    SELECT
+        chunk_id,
+        strftime(to_timestamp(timestamp), '%Y-%m-%d %H:%M:%S') as chunk_time,
+        text
+    FROM lance_data
+    WHERE session_id = $1
+    ORDER BY timestamp, chunk_id
+    """
+    session_chunks = con.execute(session_chunks_sql, [sample_session]).df()
 
     print(f"\nExample: Session {sample_session}")
     print(f"This session has {len(session_chunks)} chunks:")
 
     for i, (_, chunk) in enumerate(session_chunks.iterrows()):
         print(f"\nChunk {i + 1} (chunk_id: {chunk['chunk_id']}):")
-        print(
-            f"  Timestamp: {datetime.fromtimestamp(chunk['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}"
-        )
+        print(f"  Timestamp: {chunk['chunk_time']}")
         print(f"  Text: {chunk['text'][:100]}...")
         print(f"  Length: {len(chunk['text'])} characters")
 
@@ -64,24 +175,22 @@ def analyze_data_model(table_name="whiskey_jack", data_dir="."):
     print("Multiple chunks are combined into one complete conversation")
 
     # Show aggregation SQL
-    lance_data = table.to_lance()
-
     sql = """
     SELECT 
         session_id,
         COUNT(*) as chunk_count,
-        FIRST(timestamp) as first_timestamp,
-        STRING_AGG(text, ' ') as full_text,
-        FIRST(target) as participant
-    FROM 
-        (SELECT * FROM lance_data ORDER BY timestamp, chunk_id ASC) 
+        MIN(timestamp) as first_timestamp,
+        strftime(to_timestamp(MIN(timestamp)), '%Y-%m-%d %H:%M:%S') as first_time,
+        STRING_AGG(text, ' ' ORDER BY timestamp, chunk_id) as full_text,
+        arg_min(target, (timestamp, chunk_id)) as participant
+    FROM lance_data
     GROUP BY 
         session_id
     ORDER BY first_timestamp
     LIMIT 3
     """
 
-    aggregated = duckdb.query(sql).to_df()
+    aggregated = con.query(sql).to_df()
 
     print("\nExample aggregated sessions:")
     for i, (_, session) in enumerate(aggregated.iterrows()):
@@ -89,9 +198,7 @@ def analyze_data_model(table_name="whiskey_jack", data_dir="."):
         print(f"  Participant: {session['participant']}")
         print(f"  Chunks combined: {session['chunk_count']}")
         print(f"  Total text length: {len(session['full_text']):,} characters")
-        print(
-            f"  First timestamp: {datetime.fromtimestamp(session['first_timestamp']).strftime('%Y-%m-%d %H:%M:%S')}"
-        )
+        print(f"  First timestamp: {session['first_time']}")
         print(f"  Text preview: {session['full_text'][:150]}...")
 
     print("\n4. KEY DIFFERENCES")
@@ -126,39 +233,64 @@ def analyze_data_model(table_name="whiskey_jack", data_dir="."):
     print("\n6. COLUMN ANALYSIS")
     print("-" * 40)
 
-    # Analyze key columns
-    key_columns = ["session_id", "text", "chunk_id", "timestamp", "target", "vector"]
-
-    for col in key_columns:
-        if col in df.columns:
-            print(f"\n{col}:")
-            if col == "session_id":
-                unique_count = df[col].nunique()
-                print(f"  - {unique_count} unique sessions")
-                print(f"  - Example: {df[col].iloc[0]}")
-            elif col == "text":
-                lengths = df[col].str.len()
-                print(
-                    f"  - Chunk lengths: {lengths.min()}-{lengths.max()} chars (avg: {lengths.mean():.0f})"
-                )
-                print(f"  - Example: {df[col].iloc[0][:100]}...")
-            elif col == "chunk_id":
-                print(f"  - Range: {df[col].min()}-{df[col].max()}")
-                print("  - Purpose: Ordering chunks within a session")
-            elif col == "timestamp":
-                timestamps = pd.to_datetime(df[col], unit="s")
-                print(f"  - Range: {timestamps.min()} to {timestamps.max()}")
-                print("  - Purpose: Chronological ordering")
-            elif col == "target":
-                unique_targets = df[col].unique()[:5]
-                print(f"  - Participants: {len(df[col].unique())} unique")
-                print(f"  - Examples: {', '.join(map(str, unique_targets))}")
-            elif col == "vector":
-                vector_sample = df[col].iloc[0]
-                if isinstance(vector_sample, list):
-                    print(f"  - Dimensions: {len(vector_sample)}")
-                    print("  - Type: Embedding vector for semantic search")
-                    print(f"  - Example values: {vector_sample[:5]}...")
+    # Analyze key columns in a single aggregation round-trip
+    stats_sql = """
+    SELECT
+        COUNT(DISTINCT session_id) as unique_sessions,
+        FIRST(session_id) as example_session,
+        MIN(LENGTH(text)) as min_length,
+        MAX(LENGTH(text)) as max_length,
+        AVG(LENGTH(text)) as avg_length,
+        FIRST(text) as example_text,
+        MIN(chunk_id) as min_chunk_id,
+        MAX(chunk_id) as max_chunk_id,
+        MIN(timestamp) as min_timestamp,
+        MAX(timestamp) as max_timestamp,
+        COUNT(DISTINCT target) as unique_targets
+    FROM lance_data
+    """
+
+    stats = con.query(stats_sql).to_df().iloc[0]
+    example_targets = [
+        row[0]
+        for row in con.query(
+            "SELECT DISTINCT target FROM lance_data LIMIT 5"
+        ).fetchall()
+    ]
+
+    print("\nsession_id:")
+    print(f"  - {stats['unique_sessions']} unique sessions")
+    print(f"  - Example: {stats['example_session']}")
+
+    print("\ntext:")
+    print(
+        f"  - Chunk lengths: {stats['min_length']}-{stats['max_length']} chars (avg: {stats['avg_length']:.0f})"
+    )
+    print(f"  - Example: {stats['example_text'][:100]}...")
+
+    print("\nchunk_id:")
+    print(f"  - Range: {stats['min_chunk_id']}-{stats['max_chunk_id']}")
+    print("  - Purpose: Ordering chunks within a session")
+
+    print("\ntimestamp:")
+    print(
+        f"  - Range: {pd.to_datetime(stats['min_timestamp'], unit='s')} to {pd.to_datetime(stats['max_timestamp'], unit='s')}"
+    )
+    print("  - Purpose: Chronological ordering")
+
+    print("\ntarget:")
+    print(f"  - Participants: {stats['unique_targets']} unique")
+    print(f"  - Examples: {', '.join(map(str, example_targets))}")
+
+    if "vector" in schema.names:
+        # Read a single embedding instead of materializing the whole column
+        vector_sample = (
+            load_cols(table, ["vector"], limit=1).column("vector")[0].as_py()
+        )
+        print("\nvector:")
+        print(f"  - Dimensions: {len(vector_sample)}")
+        print("  - Type: Embedding vector for semantic search")
+        print(f"  - Example values: {vector_sample[:5]}...")
 
     print("\n7. STORAGE EFFICIENCY")
     print("-" * 40)
@@ -208,6 +340,27 @@ Examples:
         default=".",
         help="Directory containing LanceDB data (default: current directory)",
     )
+    parser.add_argument(
+        "--to-float32",
+        action="store_true",
+        help="Write a copy of the table with float32 vectors to <table>_f32 and exit",
+    )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="Build an ANN index on the table's vector column and exit",
+    )
     args = parser.parse_args()
 
-    analyze_data_model(args.table, args.data_dir)
+    if args.build_index:
+        table = lancedb.connect(args.data_dir).open_table(args.table)
+        if ensure_vector_index(table):
+            print(f"Vector index available on table: {args.table}")
+        else:
+            print(f"No vector index built on table: {args.table}")
+    elif args.to_float32:
+        db = lancedb.connect(args.data_dir)
+        migrated = migrate_vectors_to_float32(db, args.table)
+        print(f"Vectors stored as float32 in table: {migrated.name}")
+    else:
+        analyze_data_model(args.table, args.data_dir)
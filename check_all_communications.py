@@ -5,33 +5,61 @@ Check all communication types correlation between NDJSON, Neo4j, and LanceDB
 
 import argparse
 import json
+import os
+from collections import Counter
 import lancedb
 import duckdb
 
+from lance_utils import WORD_PATTERN
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Check communication types correlation between NDJSON, Neo4j, and LanceDB",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s                                    # Check whiskey_jack table in current directory
-  %(prog)s --table evidence_calls             # Check custom table in current directory
-  %(prog)s --data-dir /path/to/data           # Check whiskey_jack table in specific directory
-  %(prog)s --data-dir ./case_data --table phone_records  # Check custom table in specific directory
-        """,
-    )
-    parser.add_argument(
-        "--table",
-        default="whiskey_jack",
-        help="LanceDB table name (default: whiskey_jack)",
-    )
-    parser.add_argument(
-        "--data-dir",
-        default=".",
-        help="Directory containing LanceDB data (default: current directory)",
-    )
-    args = parser.parse_args()
+
+def tally_session_types(sessions_file):
+    """Count the session types in an NDJSON file, keeping example GUIDs
+
+    Every line is parsed on its own, so a line holding concatenated objects
+    or broken JSON is reported with its position and skipped, while a valid
+    object without a sessiontype counts as Unknown. Run fix_ndjson.py to
+    recover the skipped lines.
+
+    Returns:
+        tuple: (session_types, examples_by_type) - counts by type, most
+        common first, and the first three GUIDs of each type in file order
+    """
+    session_types = Counter()
+    examples_by_type = {}
+    with open(sessions_file, "r") as f:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                session = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Skipping line {i + 1} due to JSON error: {e}")
+                continue
+
+            session_type = session.get("sessiontype", "Unknown")
+            session_types[session_type] += 1
+            examples = examples_by_type.setdefault(session_type, [])
+            if len(examples) < 3:
+                examples.append(session.get("sessionguid"))
+
+    return dict(session_types.most_common()), examples_by_type
+
+
+def check_all_communications(table_name="whiskey_jack", data_dir=".", con=None):
+    """Correlate NDJSON session types with the sessions stored in LanceDB
+
+    Pass an existing DuckDB connection to share it with other analyses in the
+    same process. Returns the frozenset of LanceDB session IDs so callers can
+    reuse the distinct scan.
+    """
+    if con is None:
+        # One DuckDB connection shared by every query below
+        con = duckdb.connect()
+        # Use every core for the GROUP BY aggregations; none of the unordered
+        # queries depend on scan order
+        con.execute(f"SET threads = {os.cpu_count()}")
+        con.execute("SET preserve_insertion_order = false")
 
     print("🔍 Complete Communication Types Analysis")
     print("=" * 70)
@@ -41,10 +69,8 @@ Examples:
     print("-" * 50)
 
     # Try fixed file first, fallback to original
-    sessions_file_fixed = f"{args.data_dir}/sessions_fixed.ndjson"
-    sessions_file_original = f"{args.data_dir}/sessions.ndjson"
-
-    import os
+    sessions_file_fixed = f"{data_dir}/sessions_fixed.ndjson"
+    sessions_file_original = f"{data_dir}/sessions.ndjson"
 
     if os.path.exists(sessions_file_fixed):
         sessions_file = sessions_file_fixed
@@ -52,25 +78,10 @@ Examples:
     else:
         sessions_file = sessions_file_original
         print("📊 Using original NDJSON data (with minor parsing issues)")
-    sessions = []
-    with open(sessions_file, "r") as f:
-        for i, line in enumerate(f):
-            try:
-                if line.strip():
-                    sessions.append(json.loads(line.strip()))
-            except json.JSONDecodeError as e:
-                print(f"Warning: Skipping line {i + 1} due to JSON error: {e}")
-                continue
-
-    session_types = {}
-    for session in sessions:
-        session_type = session.get("sessiontype", "Unknown")
-        session_types[session_type] = session_types.get(session_type, 0) + 1
+    session_types, examples_by_type = tally_session_types(sessions_file)
 
     print("Session types from NDJSON:")
-    for session_type, count in sorted(
-        session_types.items(), key=lambda x: x[1], reverse=True
-    ):
+    for session_type, count in session_types.items():
         print(f"  {session_type}: {count}")
 
     # Neo4j confirmed counts
@@ -92,14 +103,6 @@ Examples:
     print("\n📱 Sample Session GUIDs by Type")
     print("-" * 50)
 
-    examples_by_type = {}
-    for session in sessions:
-        session_type = session.get("sessiontype", "Unknown")
-        if session_type not in examples_by_type:
-            examples_by_type[session_type] = []
-        if len(examples_by_type[session_type]) < 3:
-            examples_by_type[session_type].append(session.get("sessionguid"))
-
     for session_type, guids in examples_by_type.items():
         print(f"\n{session_type} examples:")
         for guid in guids:
@@ -109,17 +112,17 @@ Examples:
     print("\n📈 LanceDB Content Analysis")
     print("-" * 50)
 
-    db = lancedb.connect(args.data_dir)
-    table = db.open_table(args.table)
-    whiskey_table = table.to_lance()
+    db = lancedb.connect(data_dir)
+    table = db.open_table(table_name)
+    con.register("whiskey_table", table.to_lance())
 
     # Check what session IDs exist in LanceDB
     lancedb_sessions_sql = """
     SELECT DISTINCT session_id
     FROM whiskey_table
     """
-    lancedb_session_ids = set(
-        row[0] for row in duckdb.query(lancedb_sessions_sql).fetchall()
+    lancedb_session_ids = frozenset(
+        row[0] for row in con.query(lancedb_sessions_sql).fetchall()
     )
     print(f"Total sessions in LanceDB: {len(lancedb_session_ids)}")
 
@@ -129,10 +132,7 @@ Examples:
 
     correlation_results = {}
     for session_type, guids in examples_by_type.items():
-        matches = 0
-        for guid in guids:
-            if guid in lancedb_session_ids:
-                matches += 1
+        matches = len(lancedb_session_ids.intersection(guids))
 
         correlation_results[session_type] = {
             "tested": len(guids),
@@ -143,7 +143,7 @@ Examples:
         print(f"{session_type}:")
         print(f"  Tested: {len(guids)} samples")
         print(f"  Matched: {matches} in LanceDB")
-        print(f"  Success rate: {matches / len(guids) * 100:.1f}%")
+        print(f"  Success rate: {correlation_results[session_type]['percentage']:.1f}%")
 
     # Get sample content for matched non-telephony sessions
     print("\n💬 Sample Content from Non-Telephony Sessions")
@@ -161,33 +161,30 @@ Examples:
         if guid in lancedb_session_ids
     ]
 
-    if messaging_guids:
-        print("📱 Messaging content samples:")
-        for guid in messaging_guids[:2]:
-            content_sql = f"""
-            SELECT STRING_AGG(text, ' ') as full_text
-            FROM whiskey_table 
-            WHERE session_id = '{guid}'
-            """
-            result = duckdb.query(content_sql).fetchone()
-            if result and result[0]:
-                text = result[0]
-                word_count = len(text.split())
-                preview = text[:150] + "..." if len(text) > 150 else text
-                print(f"  Session {guid}: {word_count} words")
-                print(f"  Text: {preview}")
-
-    if email_guids:
-        print("\n📧 Email content samples:")
-        for guid in email_guids[:2]:
-            content_sql = f"""
-            SELECT STRING_AGG(text, ' ') as full_text
-            FROM whiskey_table 
-            WHERE session_id = '{guid}'
-            """
-            result = duckdb.query(content_sql).fetchone()
-            if result and result[0]:
-                text = result[0]
+    # Fetch every sample transcript in one grouped scan
+    sample_guids = messaging_guids[:2] + email_guids[:2]
+    sample_texts = {}
+    if sample_guids:
+        content_sql = """
+        SELECT
+            session_id,
+            STRING_AGG(text, ' ' ORDER BY timestamp, chunk_id) as full_text
+        FROM whiskey_table
+        WHERE session_id = ANY($1)
+        GROUP BY session_id
+        """
+        sample_texts = dict(con.execute(content_sql, [sample_guids]).fetchall())
+
+    for heading, guids in [
+        ("📱 Messaging content samples:", messaging_guids),
+        ("\n📧 Email content samples:", email_guids),
+    ]:
+        if not guids:
+            continue
+        print(heading)
+        for guid in guids[:2]:
+            text = sample_texts.get(guid)
+            if text:
                 word_count = len(text.split())
                 preview = text[:150] + "..." if len(text) > 150 else text
                 print(f"  Session {guid}: {word_count} words")
@@ -197,40 +194,31 @@ Examples:
     print("\n📊 UPDATED EDA: All Communication Types")
     print("-" * 50)
 
-    all_session_texts_sql = """
-    SELECT 
-        session_id,
-        STRING_AGG(text, ' ') as full_text,
-        COUNT(*) as chunk_count
-    FROM 
-        (SELECT * FROM whiskey_table ORDER BY timestamp, chunk_id ASC) 
-    GROUP BY 
-        session_id
+    # Count words per session and bucket them in one query. Sessions are
+    # chunks joined by single spaces, so a session's word count is the sum of
+    # its chunks' str.split() counts and the full text never has to be built.
+    length_buckets_sql = """
+    WITH session_words AS (
+        SELECT
+            session_id,
+            SUM(len(regexp_extract_all(text, $word_pattern))) as word_count
+        FROM whiskey_table
+        GROUP BY session_id
+    )
+    SELECT
+        COUNT(*) as total_sessions,
+        COUNT(*) FILTER (WHERE word_count < 20) as very_short,
+        COUNT(*) FILTER (WHERE word_count >= 20 AND word_count < 50) as short,
+        COUNT(*) FILTER (WHERE word_count >= 50 AND word_count < 200) as medium,
+        COUNT(*) FILTER (WHERE word_count >= 200) as long,
+        AVG(word_count) as avg_words
+    FROM session_words
     """
 
-    all_sessions = duckdb.query(all_session_texts_sql).fetchall()
-
-    # Categorize by length across all communication types
-    very_short = 0  # <20 words - likely text messages
-    short = 0  # 20-50 words
-    medium = 0  # 50-200 words
-    long = 0  # >200 words
-
-    word_counts = []
-    for session_id, full_text, chunk_count in all_sessions:
-        word_count = len(full_text.split())
-        word_counts.append(word_count)
-
-        if word_count < 20:
-            very_short += 1
-        elif word_count < 50:
-            short += 1
-        elif word_count < 200:
-            medium += 1
-        else:
-            long += 1
-
-    total_sessions = len(all_sessions)
+    total_sessions, very_short, short, medium, long, avg_words = con.execute(
+        length_buckets_sql, {"word_pattern": WORD_PATTERN}
+    ).fetchone()
+
     print("Content analysis across ALL communication types:")
     print(
         f"  Very short (<20 words): {very_short} ({very_short / total_sessions * 100:.1f}%) - Text messages"
@@ -245,7 +233,6 @@ Examples:
         f"  Long (>200 words): {long} ({long / total_sessions * 100:.1f}%) - Phone calls/long emails"
     )
 
-    avg_words = sum(word_counts) / len(word_counts)
     print(f"\nOverall average: {avg_words:.0f} words per communication")
 
     print("\n🎯 KEY INSIGHTS")
@@ -263,6 +250,35 @@ Examples:
 
     print("\n✅ Analysis Complete!")
 
+    return lancedb_session_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check communication types correlation between NDJSON, Neo4j, and LanceDB",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                    # Check whiskey_jack table in current directory
+  %(prog)s --table evidence_calls             # Check custom table in current directory
+  %(prog)s --data-dir /path/to/data           # Check whiskey_jack table in specific directory
+  %(prog)s --data-dir ./case_data --table phone_records  # Check custom table in specific directory
+        """,
+    )
+    parser.add_argument(
+        "--table",
+        default="whiskey_jack",
+        help="LanceDB table name (default: whiskey_jack)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=".",
+        help="Directory containing LanceDB data (default: current directory)",
+    )
+    args = parser.parse_args()
+
+    check_all_communications(args.table, args.data_dir)
+
 
 if __name__ == "__main__":
     main()
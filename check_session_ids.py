@@ -4,8 +4,12 @@ Check session ID correlation between Neo4j and LanceDB
 """
 
 import argparse
+import heapq
 import lancedb
 import duckdb
+import pyarrow.compute as pc
+
+from lance_utils import load_cols
 
 
 def main():
@@ -32,21 +36,17 @@ def main():
     print("\n📊 LanceDB Session IDs")
     print("-" * 50)
 
-    session_sql = """
-    SELECT DISTINCT session_id
-    FROM whiskey_table
-    ORDER BY session_id
-    LIMIT 10
-    """
+    # One distinct scan, reused for the count, the sample and the lookups.
+    # Only the session_id column is read, straight into Arrow.
+    session_id_column = load_cols(table, ["session_id"]).column("session_id")
+    lancedb_session_ids = frozenset(pc.unique(session_id_column).to_pylist())
+    sample_session_ids = heapq.nsmallest(10, lancedb_session_ids)
 
-    lancedb_sessions = duckdb.query(session_sql).fetchall()
     print("Sample LanceDB session_ids:")
-    for session in lancedb_sessions:
-        print(f"  {session[0]}")
+    for session_id in sample_session_ids:
+        print(f"  {session_id}")
 
-    print(
-        f"\nTotal unique LanceDB sessions: {len(duckdb.query('SELECT DISTINCT session_id FROM whiskey_table').fetchall())}"
-    )
+    print(f"\nTotal unique LanceDB sessions: {len(lancedb_session_ids)}")
 
     # Test Connor's approach - get a mapping
     print("\n🔗 Testing Connor's Lookup Approach")
@@ -56,9 +56,8 @@ def main():
     session_text_sql = """
     SELECT 
         session_id,
-        STRING_AGG(text, ' ') as full_text
-    FROM 
-        (SELECT * FROM whiskey_table ORDER BY timestamp, chunk_id ASC) 
+        STRING_AGG(text, ' ' ORDER BY timestamp, chunk_id) as full_text
+    FROM whiskey_table
     GROUP BY 
         session_id
     ORDER BY session_id
@@ -81,8 +80,6 @@ def main():
         "1babd75a-1e15-4823-87ac-ee2952a53af4",
     ]
 
-    lancedb_session_ids = [session[0] for session in lancedb_sessions]
-
     print("\n📋 COMPARISON RESULTS")
     print("-" * 50)
     print("Neo4j sample sessionguids:")
@@ -90,11 +87,11 @@ def main():
         print(f"  {guid}")
 
     print("\nLanceDB sample session_ids:")
-    for sid in lancedb_session_ids:
+    for sid in sample_session_ids:
         print(f"  {sid}")
 
     # Check for any matches
-    matches = set(neo4j_guids) & set(lancedb_session_ids)
+    matches = lancedb_session_ids.intersection(neo4j_guids)
     print(f"\n🎯 Direct matches found: {len(matches)}")
     if matches:
         print("Matching IDs:")
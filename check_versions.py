@@ -5,6 +5,25 @@ Check current package versions and compatibility
 
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+
+
+def get_latest_version(package):
+    """Ask the package index for the latest release of one package"""
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", "index", "versions", package],
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode == 0:
+        # First line reads "<package> (<latest version>)"
+        first_line = result.stdout.split("\n", 1)[0]
+        if "(" in first_line:
+            return first_line.split("(", 1)[1].split(")", 1)[0].strip()
+
+    return "Unknown"
 
 
 def get_latest_versions():
@@ -14,54 +33,21 @@ def get_latest_versions():
     print("Current vs Latest Package Versions")
     print("=" * 60)
 
+    # Index lookups are network-bound, so run them all at once
+    with ThreadPoolExecutor(max_workers=len(packages)) as executor:
+        latest_lookups = {
+            package: executor.submit(get_latest_version, package)
+            for package in packages
+        }
+
     for package in packages:
         try:
-            # Get current version
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "show", package],
-                capture_output=True,
-                text=True,
-            )
-
-            if result.returncode == 0:
-                for line in result.stdout.split("\n"):
-                    if line.startswith("Version:"):
-                        current_version = line.split(":", 1)[1].strip()
-                        break
-                else:
-                    current_version = "Not installed"
-            else:
+            # Read the installed version from package metadata in-process
+            try:
+                current_version = version(package)
+            except PackageNotFoundError:
                 current_version = "Not installed"
-
-            # Get latest version
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "index", "versions", package],
-                capture_output=True,
-                text=True,
-            )
-
-            if result.returncode == 0:
-                lines = result.stdout.split("\n")
-                for line in lines:
-                    if "Available versions:" in line:
-                        # Get the first version (latest)
-                        versions_line = next(
-                            (
-                                l
-                                for l in lines
-                                if l.strip() and not l.startswith("Available")
-                            ),
-                            "",
-                        )
-                        if versions_line:
-                            latest_version = versions_line.strip().split(",")[0].strip()
-                        else:
-                            latest_version = "Unknown"
-                        break
-                else:
-                    latest_version = "Unknown"
-            else:
-                latest_version = "Unknown"
+            latest_version = latest_lookups[package].result()
 
             print(
                 f"{package:12} | Current: {current_version:12} | Latest: {latest_version}"
@@ -0,0 +1,189 @@
+"""
+Shared pytest fixtures for the script test suites
+"""
+
+import hashlib
+import os
+import runpy
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from importlib.metadata import PackageNotFoundError, version
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+
+GANTRY_CASE_DIR = "./data/gantry"
+GANTRY_DASHBOARD = os.path.join(GANTRY_CASE_DIR, "investigation_dashboard.html")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--reuse-gantry",
+        action="store_true",
+        help="Replay Gantry investigation runs recorded by an earlier pytest run "
+        "while their inputs are unchanged (timing checks are skipped)",
+    )
+
+
+def run_investigation(*args):
+    """Run investigate_case.py against the Gantry case and time it
+
+    Returns:
+        SimpleNamespace: result (CompletedProcess), elapsed seconds, and
+        replayed (False: this is a real, timed run)
+    """
+    start_time = time.time()
+    result = subprocess.run(
+        [sys.executable, "investigate_case.py", "--case-dir", GANTRY_CASE_DIR, *args],
+        capture_output=True,
+        text=True,
+        timeout=15,
+    )
+    return SimpleNamespace(
+        result=result, elapsed=time.time() - start_time, replayed=False
+    )
+
+
+def gantry_inputs_key(*args):
+    """Fingerprint of everything a Gantry investigation run depends on
+
+    Covers the investigate_case.py source, the arguments, the installed
+    versions of the libraries it runs on, the sessions files' size and
+    modification time, and the version of every LanceDB table in the case,
+    so any change to code, dependencies or data gives a new key.
+    """
+    # Only needed when the Gantry data is present, so not imported up front
+    import lancedb
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open("investigate_case.py", "rb") as f:
+        digest.update(f.read())
+    digest.update(repr(args).encode())
+    digest.update(sys.version.encode())
+    for package in ("lancedb", "pylance", "duckdb", "pyarrow", "orjson"):
+        try:
+            digest.update(f"{package}:{version(package)}".encode())
+        except PackageNotFoundError:
+            digest.update(f"{package}:-".encode())
+    for name in ("sessions_fixed.ndjson", "sessions.ndjson"):
+        path = os.path.join(GANTRY_CASE_DIR, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            digest.update(f"{name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    db = lancedb.connect(GANTRY_CASE_DIR)
+    for name in db.table_names():
+        digest.update(f"{name}:{db.open_table(name).version}".encode())
+    return digest.hexdigest()
+
+
+def cached_investigation(config, *args):
+    """run_investigation, reusing a successful run from an earlier pytest run
+
+    Only with pytest --reuse-gantry: successful runs are recorded in the
+    pytest cache together with the gantry_inputs_key they were made from, and
+    replayed while that key still matches. A replayed run has replayed=True
+    and its elapsed time is the recorded one, so timing checks must not rely
+    on it. Without the option every test session times a real run.
+    """
+    cache = getattr(config, "cache", None)
+    if cache is None or not config.getoption("reuse_gantry"):
+        return run_investigation(*args)
+
+    cache_name = "investigate_case/gantry" + "".join(args)
+    key = gantry_inputs_key(*args)
+    entry = cache.get(cache_name, None)
+    # The dashboard itself lives on disk, so it must still be there too
+    if (
+        entry
+        and entry["key"] == key
+        and ("--summary" in args or os.path.exists(GANTRY_DASHBOARD))
+    ):
+        result = subprocess.CompletedProcess(
+            entry["args"], entry["returncode"], entry["stdout"], entry["stderr"]
+        )
+        return SimpleNamespace(result=result, elapsed=entry["elapsed"], replayed=True)
+
+    run = run_investigation(*args)
+    if run.result.returncode == 0:
+        cache.set(
+            cache_name,
+            {
+                "key": key,
+                "args": run.result.args,
+                "returncode": run.result.returncode,
+                "stdout": run.result.stdout,
+                "stderr": run.result.stderr,
+                "elapsed": run.elapsed,
+            },
+        )
+    return run
+
+
+def run_in_process(script, *args):
+    """Run a script as __main__ in this interpreter and capture its stdout
+
+    Only for calls that stop before doing any work, such as --help or a
+    fix_ndjson dry run. Running in-process means lancedb, duckdb and friends
+    are imported once per test session rather than once per spawned
+    interpreter.
+
+    Returns:
+        tuple: (exit_code, stdout)
+    """
+    output = StringIO()
+    saved_argv = sys.argv
+    sys.argv = [script, *args]
+    exit_code = 0
+    try:
+        with redirect_stdout(output):
+            runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code or 0
+    finally:
+        sys.argv = saved_argv
+    return exit_code, output.getvalue()
+
+
+@pytest.fixture(scope="session")
+def run_script():
+    """run_in_process, as a fixture for tests that call a script's CLI"""
+    return run_in_process
+
+
+@pytest.fixture(scope="session")
+def script_help():
+    """(exit_code, stdout) of script --help, run once per test session"""
+    outputs = {}
+
+    def get_help(script):
+        if script not in outputs:
+            outputs[script] = run_in_process(script, "--help")
+        return outputs[script]
+
+    return get_help
+
+
+@pytest.fixture(scope="session")
+def gantry_dashboard(request):
+    """Gantry dashboard build, run once and shared by the dashboard tests
+
+    The dashboard is deterministic for a given case directory, so every test
+    asserts against the same run instead of rebuilding 67K sessions itself.
+    With --reuse-gantry an unchanged case is not rebuilt across pytest runs
+    either. html is empty when the build failed.
+    """
+    run = cached_investigation(request.config)
+    run.html = ""
+    if run.result.returncode == 0 and os.path.exists(GANTRY_DASHBOARD):
+        with open(GANTRY_DASHBOARD, "r") as f:
+            run.html = f.read()
+    return run
+
+
+@pytest.fixture(scope="session")
+def gantry_summary(request):
+    """Gantry --summary run, shared by the terminal summary tests"""
+    return cached_investigation(request.config, "--summary")
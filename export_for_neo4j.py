@@ -5,13 +5,123 @@ Flexible JSON export with stdout/file output options
 """
 
 import argparse
+import glob
+import hashlib
 import json
+import os
+import shutil
 import sys
-import lancedb
-import duckdb
+from functools import lru_cache
 
+try:
+    import orjson
 
-def main():
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def encode_json(obj, indent=None):
+    """Serialize obj to UTF-8 JSON bytes
+
+    Uses orjson when installed and the indent is one it supports (compact or
+    2 spaces), otherwise the standard library encoder set up to match orjson:
+    raw UTF-8 rather than \\u escapes, and no spaces in compact output. The
+    bytes are the same whichever encoder runs.
+    """
+    if HAS_ORJSON and indent in (None, 2):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    separators = None if indent else (",", ":")
+    return json.dumps(
+        obj, indent=indent, ensure_ascii=False, separators=separators
+    ).encode()
+
+
+@lru_cache(maxsize=8)
+def open_table(data_dir, table_name):
+    """Open a LanceDB table once per process and reuse it on later calls"""
+    import lancedb
+
+    return lancedb.connect(data_dir).open_table(table_name)
+
+
+@lru_cache(maxsize=8)
+def open_lance_dataset(data_dir, table_name, version):
+    """Lance dataset view of a table, cached per table version"""
+    return open_table(data_dir, table_name).to_lance()
+
+
+def iter_transcripts(reader):
+    """Yield (session_id, transcript) pairs from the aggregation's Arrow reader"""
+    for batch in reader:
+        for row in batch.to_pylist():
+            yield (
+                row["session_id"],
+                {
+                    "text": row["full_text"],
+                    "chunk_count": row["chunk_count"],
+                    "char_count": row["char_count"],
+                    "session_type": row["session_type"],
+                    "content_type": row["content_type"],
+                    "target": row["target"],
+                    "timestamp": row["first_timestamp"],
+                },
+            )
+
+
+def write_transcripts(reader, out, indent=None):
+    """Stream aggregated sessions from an Arrow reader as one JSON object
+
+    Writes the same bytes as encode_json(transcripts, indent) to the binary
+    stream out one session at a time, so the full mapping is never held in
+    memory. Returns the first (session_id, transcript) pair written, for the
+    preview.
+    """
+    if indent:
+        pad = b" " * indent
+        first_sep, item_sep, closing = b"\n" + pad, b",\n" + pad, b"\n}"
+        key_sep = b": "
+    else:
+        first_sep, item_sep, closing = b"", b",", b"}"
+        key_sep = b":"
+
+    first_session = None
+
+    out.write(b"{")
+    for session_id, transcript in iter_transcripts(reader):
+        entry = encode_json(transcript, indent)
+        if indent:
+            entry = entry.replace(b"\n", b"\n" + pad)
+        out.write(first_sep if first_session is None else item_sep)
+        out.write(encode_json(session_id) + key_sep + entry)
+
+        if first_session is None:
+            first_session = (session_id, transcript)
+    out.write(b"}" if first_session is None else closing)
+
+    return first_session
+
+
+def write_transcripts_ndjson(reader, out):
+    """Stream aggregated sessions as NDJSON, one compact session per line
+
+    Each line carries the session_id alongside the transcript fields, so
+    loaders can import the file line by line. Returns the first
+    (session_id, transcript) pair written, for the preview.
+    """
+    first_session = None
+
+    for session_id, transcript in iter_transcripts(reader):
+        out.write(encode_json({"session_id": session_id, **transcript}) + b"\n")
+
+        if first_session is None:
+            first_session = (session_id, transcript)
+
+    return first_session
+
+
+def main(argv=None):
+    """Run the export; argv defaults to the command line arguments"""
     parser = argparse.ArgumentParser(
         description="Export LanceDB transcripts to JSON for Neo4j import",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -22,6 +132,7 @@ Examples:
   %(prog)s --data-dir /secure/ops/case-beta --table phone_records
   %(prog)s -o custom-output.json              # Custom output filename
   %(prog)s -o -                               # Explicit stdout
+  %(prog)s --format ndjson -o transcripts.ndjson  # One session per line
         """,
     )
 
@@ -46,6 +157,14 @@ Examples:
         help="JSON indentation level (default: 2, use 0 for compact)",
     )
 
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="json: one object keyed by session_id (default); "
+        "ndjson: one session per line",
+    )
+
     parser.add_argument(
         "--table",
         default="whiskey_jack",
@@ -58,7 +177,17 @@ Examples:
         help="Directory containing LanceDB tables (default: current directory)",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-run the export and keep no cached copy (file exports "
+        "otherwise store a second copy of the output in <data-dir>/.cache)",
+    )
+
+    args = parser.parse_args(argv)
+
+    # Heavy imports are deferred so importing this module stays cheap
+    import duckdb
 
     # Progress messages go to stderr if outputting to stdout
     output_to_stdout = args.output == "-"
@@ -70,91 +199,153 @@ Examples:
 
     log("🔄 Exporting LanceDB transcripts for Neo4j...")
 
-    # Connect using battle-tested pattern
-    db = lancedb.connect(args.data_dir)
-    table = db.open_table(args.table)
-    whiskey_table = table.to_lance()
+    # Connection and dataset are reused across in-process calls; refresh to
+    # the latest version first so writes made since are not missed
+    table = open_table(args.data_dir, args.table)
+    table.checkout_latest()
+    whiskey_table = open_lance_dataset(args.data_dir, args.table, table.version)
+
+    row_count = table.count_rows()
+    log(f"📊 Total rows in LanceDB: {row_count:,}")
+
+    indent = args.indent if args.indent > 0 else None
+
+    # If using default filename, put it in the data directory for proper case organization
+    output_file = args.output
+    if args.output == "transcripts.json" and args.data_dir != ".":
+        output_file = f"{args.data_dir}/transcripts.json"
+
+    # Exports are cached per table version and format, so re-running against
+    # an unchanged table is a file copy instead of a full aggregation. The
+    # exporter's own source is part of the key, so changes to its queries or
+    # writers never serve an export made by older code.
+    with open(__file__, "rb") as f:
+        exporter_source = f.read()
+    cache_dir = os.path.join(args.data_dir, ".cache")
+    cache_key = hashlib.sha256(
+        f"{os.path.abspath(args.data_dir)}/{args.table}/{table.version}/"
+        f"{row_count}/{args.format}/{indent}/{HAS_ORJSON}/".encode()
+        + exporter_source
+    ).hexdigest()[:16]
+    cache_name = f"export_{args.table}_{{}}.{args.format}"
+    cache_path = os.path.join(cache_dir, cache_name.format(cache_key))
 
-    log(f"📊 Total rows in LanceDB: {table.count_rows():,}")
+    if not args.no_cache and os.path.exists(cache_path):
+        log("♻️  Table unchanged since the last export, reusing cached output")
+        log("   (aggregation statistics and sample skipped; use --no-cache for them)")
+        if output_to_stdout:
+            with open(cache_path, "rb") as f:
+                shutil.copyfileobj(f, sys.stdout.buffer)
+            if args.format == "json":
+                sys.stdout.buffer.write(b"\n")
+            log("✅ Exported cached transcripts to stdout")
+        else:
+            shutil.copyfile(cache_path, output_file)
+            log(f"✅ Exported to: {output_file}")
+            log(f"📁 File size: {os.path.getsize(output_file) / 1024 / 1024:.1f} MB")
+        return
 
-    # Aggregate transcripts using proven SQL pattern with type info
+    # Register the dataset once on an explicit connection; the queries name
+    # only the columns they use, so the vector column is never read
+    con = duckdb.connect()
+    con.register("whiskey_table", whiskey_table)
+
+    # Aggregate transcripts using proven SQL pattern with type info. Chunk
+    # order is applied inside each group instead of sorting the whole table,
+    # and the first chunk's metadata is picked with arg_min.
     sql = """
     SELECT 
         session_id, 
-        STRING_AGG(text, ' ') as full_text,
+        STRING_AGG(text, ' ' ORDER BY timestamp, chunk_id) as full_text,
+        CAST(SUM(LENGTH(text)) + COUNT(text) - 1 AS BIGINT) as char_count,
         COUNT(*) as chunk_count,
-        FIRST(session_type) as session_type,
-        FIRST(content_type) as content_type,
-        FIRST(target) as target,
-        FIRST(timestamp) as first_timestamp
-    FROM 
-        (SELECT * FROM whiskey_table ORDER BY timestamp, chunk_id ASC) 
+        arg_min(session_type, (timestamp, chunk_id)) as session_type,
+        arg_min(content_type, (timestamp, chunk_id)) as content_type,
+        arg_min(target, (timestamp, chunk_id)) as target,
+        MIN(timestamp) as first_timestamp
+    FROM whiskey_table
     GROUP BY 
         session_id
     ORDER BY session_id
     """
 
-    log("🔄 Running aggregation query...")
-    result = duckdb.query(sql).fetchall()
-
-    # Create transcript dictionary with type information
-    transcripts = {}
-    total_chars = 0
-    type_counts = {"Telephony": 0, "Messaging": 0, "Email": 0}
-
-    for (
-        session_id,
-        full_text,
-        chunk_count,
+    # Summary counts from per-session rows typed like the exported records
+    # (first chunk's session_type); each session's text is its chunks joined
+    # by single spaces, so no transcript has to be built
+    stats_sql = """
+    WITH sessions AS (
+        SELECT
+            arg_min(session_type, (timestamp, chunk_id)) as session_type,
+            CAST(SUM(LENGTH(text)) + COUNT(text) - 1 AS BIGINT) as char_count
+        FROM whiskey_table
+        GROUP BY session_id
+    )
+    SELECT
         session_type,
-        content_type,
-        target,
-        first_timestamp,
-    ) in result:
-        transcripts[session_id] = {
-            "text": full_text,
-            "chunk_count": chunk_count,
-            "char_count": len(full_text),
-            "session_type": session_type,
-            "content_type": content_type,
-            "target": target,
-            "timestamp": first_timestamp,
-        }
-        total_chars += len(full_text)
-        type_counts[session_type] = type_counts.get(session_type, 0) + 1
+        COUNT(*) as session_count,
+        CAST(SUM(char_count) AS BIGINT) as char_count
+    FROM sessions
+    GROUP BY session_type
+    """
+
+    log("🔄 Running aggregation query...")
+    type_stats = con.query(stats_sql).fetchall()
+    session_count = sum(count for _, count, _ in type_stats)
+    total_chars = sum(chars for _, _, chars in type_stats)
+    type_counts = {session_type: count for session_type, count, _ in type_stats}
 
     log("📊 Aggregation complete:")
-    log(f"   - {len(transcripts)} unique sessions")
+    log(f"   - {session_count} unique sessions")
     log(f"   - {total_chars:,} total characters")
-    log(f"   - Average: {total_chars // len(transcripts):,} chars per session")
+    log(f"   - Average: {total_chars // session_count:,} chars per session")
     log(f"   - 📞 Telephony: {type_counts.get('Telephony', 0)} calls")
     log(f"   - 💬 Messaging: {type_counts.get('Messaging', 0)} texts")
     log(f"   - 📧 Email: {type_counts.get('Email', 0)} emails")
 
-    # Prepare JSON output
-    json_output = json.dumps(
-        transcripts, indent=args.indent if args.indent > 0 else None
-    )
+    reader = con.execute(sql).fetch_record_batch(10_000)
+
+    def write_output(out):
+        if args.format == "ndjson":
+            return write_transcripts_ndjson(reader, out)
+        return write_transcripts(reader, out, indent)
 
-    # Output to stdout or file
+    # Stream straight to stdout or the file instead of building the JSON in memory
     if output_to_stdout:
-        print(json_output)
-        log(f"✅ Exported {len(transcripts)} sessions to stdout")
+        first_session = write_output(sys.stdout.buffer)
+        if args.format == "json":
+            sys.stdout.buffer.write(b"\n")
     else:
-        # If using default filename, put it in the data directory for proper case organization
-        output_file = args.output
-        if args.output == "transcripts.json" and args.data_dir != ".":
-            output_file = f"{args.data_dir}/transcripts.json"
+        with open(output_file, "wb") as f:
+            first_session = write_output(f)
+            file_size = f.tell()
 
-        with open(output_file, "w") as f:
-            f.write(json_output)
+        if not args.no_cache:
+            # Keep only the copy for the current table version in this format
+            # (the key is exactly 16 characters, so other tables never match);
+            # copy under a temporary name so an interrupted run never leaves a
+            # partial file to be served later
+            # The cache is optional: a read-only data directory only loses it
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                stale_pattern = cache_name.format("?" * 16)
+                for stale in glob.glob(os.path.join(cache_dir, stale_pattern)):
+                    os.remove(stale)
+                shutil.copyfile(output_file, cache_path + ".tmp")
+                os.replace(cache_path + ".tmp", cache_path)
+            except OSError as e:
+                log(f"⚠️  Could not cache the export: {e}")
+                if os.path.exists(cache_path + ".tmp"):
+                    os.remove(cache_path + ".tmp")
+
+    if output_to_stdout:
+        log(f"✅ Exported {session_count} sessions to stdout")
+    else:
         log(f"✅ Exported to: {output_file}")
-        log(f"📁 File size: {len(json_output) / 1024 / 1024:.1f} MB")
+        log(f"📁 File size: {file_size / 1024 / 1024:.1f} MB")
 
     # Show sample (only if not quiet and not stdout)
     if not args.quiet and not output_to_stdout:
-        sample_id = list(transcripts.keys())[0]
-        sample = transcripts[sample_id]
+        sample_id, sample = first_session
         log("\n📝 Sample transcript:")
         log(f"   Session: {sample_id}")
         log(f"   Type: {sample['session_type']} ({sample['content_type']})")
@@ -166,4 +357,10 @@ Examples:
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # The stdout reader exited early (e.g. "-o - | head"); stop quietly
+        # instead of raising again while flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
@@ -5,124 +5,241 @@ Fixes concatenated JSON objects for investigative data integrity
 """
 
 import json
+import mmap
+import os
+import re
+import stat
 import sys
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
+# Shared by every split; raw_decode does not skip leading whitespace itself
+JSON_DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r"\s*")
 
-def fix_ndjson_file(input_file, output_file=None):
+# Where one object may end and the next begin on the same line
+OBJECT_BOUNDARY = re.compile(rb"}\s*{")
+
+# Buffer size for the fixed output file; each batch is written in one call
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Large files are repaired in batches of lines spread over worker processes
+BATCH_BYTES = 4 << 20
+PARALLEL_MIN_BYTES = 8 << 20
+
+
+def repair_lines(first_line_num, block):
     """
-    Fix NDJSON file by splitting concatenated JSON objects
+    Repair one block of raw NDJSON lines (bytes ending at a line break)
 
-    Args:
-        input_file: Path to corrupted NDJSON file
-        output_file: Path to fixed output file (optional)
+    Runs in a worker process for large files, so it only returns data.
 
     Returns:
-        tuple: (objects_recovered, lines_fixed, total_lines)
+        tuple: (output_bytes, line_count, objects_recovered, lines_fixed,
+                bad_line_nums)
     """
-    if output_file is None:
-        output_file = input_file.replace(".ndjson", "_fixed.ndjson")
+    lines = block.split(b"\n")
+    if not lines[-1]:
+        # The block ends with a line break, not with an unterminated line
+        lines.pop()
 
+    output = bytearray()
     objects_recovered = 0
     lines_fixed = 0
-    total_lines = 0
-
-    print(f"🔧 Fixing NDJSON file: {input_file}")
-    print(f"📁 Output file: {output_file}")
+    bad_line_nums = []
 
-    with (
-        open(input_file, "r", encoding="utf-8") as infile,
-        open(output_file, "w", encoding="utf-8") as outfile,
-    ):
-        for line_num, line in enumerate(infile, 1):
-            total_lines += 1
-            line = line.strip()
+    for line_num, line in enumerate(lines, first_line_num):
+        line = line.strip()
 
-            if not line:
-                continue
+        if not line:
+            continue
 
-            # Try parsing as single JSON object first (fast path)
+        # Without a "}{" boundary a line cannot hold concatenated objects, so
+        # it is parsed as a single object (fast path). Lines that have one
+        # skip that attempt, which would almost always fail.
+        if not OBJECT_BOUNDARY.search(line):
             try:
                 json.loads(line)
-                outfile.write(line + "\n")
+                output += line
+                output += b"\n"
                 objects_recovered += 1
                 continue
             except json.JSONDecodeError:
                 pass
 
-            # Line has concatenated objects - split and fix
-            lines_fixed += 1
-            objects_on_line = split_concatenated_json(line)
+        # Decoded objects were validated by the scanner; no second parse
+        objects_on_line, unrecoverable = decode_objects(line.decode("utf-8"))
 
-            for obj_text in objects_on_line:
-                try:
-                    # Validate it's proper JSON
-                    json.loads(obj_text)
-                    outfile.write(obj_text + "\n")
-                    objects_recovered += 1
-                except json.JSONDecodeError:
-                    print(f"⚠️  Line {line_num}: Could not recover one object fragment")
+        if len(objects_on_line) == 1 and not unrecoverable:
+            # A single object with "}{" inside one of its strings
+            output += line
+            output += b"\n"
+            objects_recovered += 1
+            continue
 
-    return objects_recovered, lines_fixed, total_lines
+        # Line has concatenated objects - split and fix
+        lines_fixed += 1
 
+        for obj_text in objects_on_line:
+            output += obj_text.encode("utf-8")
+            output += b"\n"
+        objects_recovered += len(objects_on_line)
 
-def split_concatenated_json(line):
+        if unrecoverable:
+            bad_line_nums.append(line_num)
+
+    return bytes(output), len(lines), objects_recovered, lines_fixed, bad_line_nums
+
+
+def read_line_batches(infile):
     """
-    Split concatenated JSON objects on a single line
+    Yield (first_line_num, block) batches of whole lines from infile
 
-    Strategy: Find }{ patterns and split there, then reconstruct valid JSON
+    A regular file is memory-mapped and cut at the first line break after
+    every BATCH_BYTES, so batches are sliced from the page cache with no
+    per-line reads or allocations. Pipes and other streams cannot be mapped
+    and report no size, so they are read in BATCH_BYTES blocks instead.
     """
-    objects = []
+    st = os.fstat(infile.fileno())
+    if not stat.S_ISREG(st.st_mode):
+        yield from read_stream_batches(infile)
+        return
+    if st.st_size == 0:
+        return
 
-    # Find all positions where one JSON ends and another begins
-    # Pattern: } followed by { (with optional whitespace)
-    split_positions = []
+    with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        first_line_num = 1
+        start = 0
+        end = len(mapped)
 
-    brace_count = 0
-    in_string = False
-    escape_next = False
+        while start < end:
+            line_break = mapped.find(b"\n", min(start + BATCH_BYTES, end) - 1)
+            stop = end if line_break == -1 else line_break + 1
+            block = mapped[start:stop]
+            yield first_line_num, block
 
-    for i, char in enumerate(line):
-        if escape_next:
-            escape_next = False
-            continue
+            first_line_num += block.count(b"\n")
+            start = stop
 
-        if char == "\\":
-            escape_next = True
-            continue
 
-        if char == '"' and not escape_next:
-            in_string = not in_string
+def read_stream_batches(infile):
+    """Yield (first_line_num, block) batches of whole lines from a stream"""
+    first_line_num = 1
+    pending = b""
+
+    while chunk := infile.read(BATCH_BYTES):
+        pending += chunk
+        line_break = pending.rfind(b"\n")
+        if line_break == -1:
             continue
+        block, pending = pending[: line_break + 1], pending[line_break + 1 :]
+        yield first_line_num, block
+        first_line_num += block.count(b"\n")
+
+    if pending:
+        yield first_line_num, pending
+
+
+def repair_batches_in_parallel(batches, workers):
+    """Repair batches across processes, yielding results in input order"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded window of batches in flight so memory stays flat
+        in_flight = deque()
+        for first_line_num, block in batches:
+            in_flight.append(executor.submit(repair_lines, first_line_num, block))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def fix_ndjson_file(input_file, output_file=None, workers=None):
+    """
+    Fix NDJSON file by splitting concatenated JSON objects
+
+    Args:
+        input_file: Path to corrupted NDJSON file
+        output_file: Path to fixed output file (optional)
+        workers: Worker processes for large files (default: CPU count)
 
-        if not in_string:
-            if char == "{":
-                brace_count += 1
-            elif char == "}":
-                brace_count -= 1
-                # If we're back to 0 braces and next non-whitespace is {,
-                # this is a split point
-                if brace_count == 0:
-                    # Look ahead for next {
-                    j = i + 1
-                    while j < len(line) and line[j].isspace():
-                        j += 1
-                    if j < len(line) and line[j] == "{":
-                        split_positions.append(i + 1)
+    Returns:
+        tuple: (objects_recovered, lines_fixed, total_lines)
+    """
+    if output_file is None:
+        output_file = input_file.replace(".ndjson", "_fixed.ndjson")
 
-    # Split the line at identified positions
-    if not split_positions:
-        return [line]  # No splits needed
+    objects_recovered = 0
+    lines_fixed = 0
+    total_lines = 0
 
-    start = 0
-    for pos in split_positions:
-        objects.append(line[start:pos].strip())
-        start = pos
+    print(f"🔧 Fixing NDJSON file: {input_file}")
+    print(f"📁 Output file: {output_file}")
 
-    # Add the last object
-    objects.append(line[start:].strip())
+    with (
+        open(input_file, "rb") as infile,
+        open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as outfile,
+    ):
+        batches = read_line_batches(infile)
+
+        # Lines are independent, so large files are repaired on every core;
+        # small ones are not worth the process start-up
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and os.path.getsize(input_file) >= PARALLEL_MIN_BYTES:
+            results = repair_batches_in_parallel(batches, workers)
+        else:
+            results = (repair_lines(*batch) for batch in batches)
+
+        for output, line_count, recovered, fixed, bad_line_nums in results:
+            outfile.write(output)
+            total_lines += line_count
+            objects_recovered += recovered
+            lines_fixed += fixed
+            for line_num in bad_line_nums:
+                print(f"⚠️  Line {line_num}: Could not recover one object fragment")
 
-    return [obj for obj in objects if obj]
+    return objects_recovered, lines_fixed, total_lines
+
+
+def decode_objects(line):
+    """
+    Decode the JSON objects concatenated on a single line
+
+    Objects are found one at a time with the C scanner behind
+    json.JSONDecoder.raw_decode and sliced from the line at the offsets it
+    reports, so every returned object is already known to be valid JSON.
+
+    Returns:
+        tuple: (objects, remainder) where remainder is the text from the first
+        undecodable position onwards, or an empty string
+    """
+    objects = []
+    end = len(line)
+    pos = WHITESPACE.match(line).end()
+
+    while pos < end:
+        try:
+            _, next_pos = JSON_DECODER.raw_decode(line, pos)
+        except json.JSONDecodeError:
+            return objects, line[pos:].strip()
+
+        objects.append(line[pos:next_pos])
+        pos = WHITESPACE.match(line, next_pos).end()
+
+    return objects, ""
+
+
+def split_concatenated_json(line):
+    """
+    Split concatenated JSON objects on a single line
+
+    Whatever cannot be decoded is returned as a final fragment so the caller
+    can report it.
+    """
+    objects, remainder = decode_objects(line)
+    if remainder:
+        objects.append(remainder)
+    return objects
 
 
 def main():
@@ -141,6 +258,11 @@ Examples:
     parser.add_argument(
         "-o", "--output", help="Output file (default: input_fixed.ndjson)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for large files (default: CPU count, 1 disables)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -157,8 +279,10 @@ Examples:
         with open(args.input_file, "r") as f:
             for line in f:
                 total_lines += 1
+                if line[0] in "\r\n":
+                    continue
                 try:
-                    json.loads(line.strip())
+                    json.loads(line)
                 except json.JSONDecodeError:
                     error_lines += 1
 
@@ -171,7 +295,7 @@ Examples:
     # Perform the fix
     try:
         objects_recovered, lines_fixed, total_lines = fix_ndjson_file(
-            args.input_file, args.output
+            args.input_file, args.output, args.workers
         )
 
         print("\n✅ NDJSON RECOVERY COMPLETE")
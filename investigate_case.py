@@ -12,37 +12,342 @@ import os
 import datetime
 import html
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from re import escape
+from string import Template
+
+from pyarrow import Table
+
+from lance_utils import WORD_PATTERN
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Size of the binary reads used to stream the sessions file
+READ_CHUNK_SIZE = 1 << 20
+
+# Words too common to be keywords
+COMMON_WORDS = frozenset(
+    {
+        "the",
+        "and",
+        "or",
+        "but",
+        "in",
+        "on",
+        "at",
+        "to",
+        "for",
+        "of",
+        "with",
+        "by",
+        "a",
+        "an",
+        "is",
+        "are",
+        "was",
+        "were",
+        "been",
+        "be",
+        "have",
+        "has",
+        "had",
+        "do",
+        "does",
+        "did",
+        "will",
+        "would",
+        "could",
+        "should",
+        "may",
+        "might",
+        "must",
+        "can",
+        "this",
+        "that",
+        "these",
+        "those",
+        "i",
+        "you",
+        "he",
+        "she",
+        "it",
+        "we",
+        "they",
+        "me",
+        "him",
+        "her",
+        "us",
+        "them",
+    }
+)
+
+# Terms flagged in the content analysis, in display order
+SUSPICIOUS_TERMS = (
+    "cash",
+    "clean",
+    "phone",
+    "usual",
+    "place",
+    "meeting",
+    "urgent",
+    "delivery",
+)
+# One alternation matching any of the terms, built once at import
+SUSPICIOUS_PATTERN = "|".join(escape(term) for term in SUSPICIOUS_TERMS)
+
+# Number of session types buffered before they are added to the counts
+TYPE_BATCH_SIZE = 1 << 16
+
+
+# Static <head> of the dashboard, including the stylesheet. It is parsed once
+# at import; only the case name and the quality color are filled in per page.
+DASHBOARD_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>🔍 $case_name - Investigation Dashboard</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: #333;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 12px;
+            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
+            overflow: hidden;
+        }
+        .header {
+            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+            color: white;
+            padding: 30px;
+            text-align: center;
+        }
+        .header h1 {
+            margin: 0;
+            font-size: 2.5em;
+            font-weight: 700;
+        }
+        .header p {
+            margin: 10px 0 0 0;
+            font-size: 1.2em;
+            opacity: 0.9;
+        }
+        .section {
+            padding: 30px;
+            border-bottom: 1px solid #eee;
+        }
+        .section:last-child {
+            border-bottom: none;
+        }
+        .section h2 {
+            margin: 0 0 20px 0;
+            font-size: 1.8em;
+            color: #2a5298;
+        }
+        .data-quality {
+            background: #f8f9fa;
+        }
+        .quality-score {
+            font-size: 3em;
+            font-weight: bold;
+            color: $quality_color;
+            text-align: center;
+            margin: 20px 0;
+        }
+        .quality-details {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin-top: 20px;
+        }
+        .quality-item {
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .stats-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 20px;
+            margin-top: 20px;
+        }
+        .stat-card {
+            background: #f8f9fa;
+            padding: 20px;
+            border-radius: 8px;
+            border-left: 4px solid #2a5298;
+        }
+        .stat-number {
+            font-size: 2em;
+            font-weight: bold;
+            color: #2a5298;
+        }
+        .players-list {
+            margin-top: 20px;
+        }
+        .player-item {
+            background: #f8f9fa;
+            padding: 15px;
+            margin: 10px 0;
+            border-radius: 8px;
+            border-left: 4px solid #28a745;
+        }
+        .keywords-container {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 10px;
+            margin-top: 20px;
+        }
+        .keyword {
+            background: #e9ecef;
+            padding: 8px 16px;
+            border-radius: 20px;
+            font-weight: 500;
+        }
+        .suspicious-keyword {
+            background: #fff3cd;
+            border: 1px solid #ffc107;
+        }
+        .recommendations {
+            background: #e7f3ff;
+        }
+        .recommendation {
+            background: white;
+            padding: 15px;
+            margin: 10px 0;
+            border-radius: 8px;
+            border-left: 4px solid #007bff;
+        }
+        .footer {
+            text-align: center;
+            padding: 20px;
+            background: #f8f9fa;
+            color: #666;
+        }
+    </style>
+</head>
+""")
 
 
-def load_sessions_data(case_dir):
-    """Load sessions from NDJSON file"""
+def open_first_existing(paths):
+    """Open the first of the given files that exists, or return None
+
+    Opening directly instead of checking os.path.exists() first costs one
+    system call per candidate instead of two.
+    """
+    for path in paths:
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def iter_sessions(case_dir):
+    """Yield sessions from the NDJSON file one at a time
+
+    The file is read in fixed-size binary chunks and split on newlines, so
+    memory use stays bounded no matter how large the case is.
+    """
     sessions_file_fixed = os.path.join(case_dir, "sessions_fixed.ndjson")
     sessions_file_original = os.path.join(case_dir, "sessions.ndjson")
 
-    if os.path.exists(sessions_file_fixed):
-        sessions_file = sessions_file_fixed
-    elif os.path.exists(sessions_file_original):
-        sessions_file = sessions_file_original
-    else:
-        return []
-
-    sessions = []
-    try:
-        with open(sessions_file, "r") as f:
-            for i, line in enumerate(f):
+    f = open_first_existing([sessions_file_fixed, sessions_file_original])
+    if f is None:
+        return
+
+    # orjson parses the raw bytes directly; its JSONDecodeError subclasses
+    # the standard library one, so the except clause covers both
+    loads = orjson.loads if HAS_ORJSON else json.loads
+
+    with f:
+        partial = b""
+        while chunk := f.read(READ_CHUNK_SIZE):
+            lines = (partial + chunk).split(b"\n")
+            # The last piece is an incomplete line until the next chunk arrives
+            partial = lines.pop()
+            for line in lines:
+                if line in (b"", b"\r"):
+                    continue
                 try:
-                    if line.strip():
-                        sessions.append(json.loads(line.strip()))
+                    yield loads(line)
                 except json.JSONDecodeError:
                     continue
-    except FileNotFoundError:
-        pass
 
-    return sessions
+        # Final line without a trailing newline
+        if partial not in (b"", b"\r"):
+            try:
+                yield loads(partial)
+            except json.JSONDecodeError:
+                pass
 
 
+def load_sessions_data(case_dir):
+    """Load sessions from NDJSON file"""
+    return list(iter_sessions(case_dir))
+
+
+@dataclass
+class SessionStats:
+    """Session-level statistics gathered in a single pass over the sessions"""
+
+    total: int = 0
+    missing_type: int = 0
+    # Distinct non-empty session ids; the ids themselves are the keys of
+    # guid_to_type, so no separate set is kept
+    id_count: int = 0
+    type_counts: Counter = field(default_factory=Counter)
+    guid_to_type: dict = field(default_factory=dict)
+
+
+def scan_sessions(sessions):
+    """Collect every session-level statistic the analyses need in one pass"""
+    stats = SessionStats()
+    type_counts = stats.type_counts
+    guid_to_type = stats.guid_to_type
+    # Types are collected in batches and counted by Counter.update, which
+    # runs in C, instead of one Python-level increment per session
+    types = []
+
+    for session in sessions:
+        stats.total += 1
+        guid = session.get("sessionguid")
+        session_type = session.get("sessiontype", "Unknown")
+
+        if not session.get("sessiontype"):
+            stats.missing_type += 1
+        types.append(session_type)
+        if len(types) >= TYPE_BATCH_SIZE:
+            type_counts.update(types)
+            types.clear()
+        # The first session with a given id decides its type; sessions
+        # without an id take no part in the correlation, so they are not kept
+        if guid and guid not in guid_to_type:
+            guid_to_type[guid] = session_type
+            stats.id_count += 1
+
+    type_counts.update(types)
+    return stats
+
+
+@lru_cache(maxsize=8)
 def load_lancedb_data(case_dir, table_name="whiskey_jack"):
-    """Load LanceDB data"""
+    """Load LanceDB data, opening each case only once per process"""
     try:
         db = lancedb.connect(case_dir)
 
@@ -62,9 +367,81 @@ def load_lancedb_data(case_dir, table_name="whiskey_jack"):
         return None, None
 
 
-def calculate_data_quality(sessions, lancedb_sessions):
+def open_case_analysis(case_dir):
+    """Open the case's LanceDB data and run the content analysis on it
+
+    Nothing here depends on the sessions file, so main() runs this on a
+    worker thread while the sessions file is scanned. Lance and DuckDB do
+    their work outside the GIL, so the two overlap.
+
+    Returns:
+        tuple: (duckdb connection or None, lance dataset or None, content)
+    """
+    _, lancedb_sessions = load_lancedb_data(case_dir)
+
+    # One DuckDB connection serves every analysis, with the dataset registered
+    # once so the queries share the connection's state
+    con = None
+    if lancedb_sessions:
+        con = duckdb.connect()
+        con.register("lancedb_sessions", lancedb_sessions)
+
+    return con, lancedb_sessions, analyze_content_intelligence(con)
+
+
+def analyze_session_activity(stats, con):
+    """Count messages per session and match the sessions to their metadata
+
+    A single DuckDB query scans the LanceDB session ids once and joins the
+    per-session counts against the session types, which gives both the
+    correlation with the sessions file and the most active sessions.
+    """
+    if con is None:
+        return None
+
+    try:
+        # Keys and values come out in the same order, so the two columns line
+        # up without a lookup per session
+        sessions_meta = Table.from_pydict(
+            {
+                "session_id": list(stats.guid_to_type.keys()),
+                "session_type": list(stats.guid_to_type.values()),
+            }
+        )
+        con.register("sessions_meta", sessions_meta)
+
+        activity_sql = """
+            WITH activity AS (
+                SELECT session_id, COUNT(*) as message_count
+                FROM lancedb_sessions
+                GROUP BY session_id
+            ),
+            matched AS (
+                SELECT a.session_id, a.message_count,
+                       m.session_id IS NOT NULL as known, m.session_type
+                FROM activity a
+                LEFT JOIN sessions_meta m ON a.session_id = m.session_id
+            )
+            SELECT session_id, message_count,
+                   CASE WHEN known THEN session_type ELSE 'Unknown' END as session_type,
+                   COUNT(*) FILTER (WHERE known) OVER () as correlated_sessions
+            FROM matched
+            ORDER BY message_count DESC, session_id
+            LIMIT 10
+        """
+        rows = con.execute(activity_sql).fetchall()
+    except Exception:
+        return None
+
+    return {
+        "correlated_sessions": rows[0][3] if rows else 0,
+        "top_sessions": [row[:3] for row in rows],
+    }
+
+
+def calculate_data_quality(stats, activity):
     """Calculate data quality metrics"""
-    if not sessions:
+    if not stats.total:
         return {
             "score": 0,
             "total_sessions": 0,
@@ -72,52 +449,34 @@ def calculate_data_quality(sessions, lancedb_sessions):
             "missing_metadata": 100,
         }
 
-    session_ids = set(
-        session.get("sessionguid") for session in sessions if session.get("sessionguid")
-    )
-
-    if lancedb_sessions:
-        lancedb_session_ids = set(
-            row[0]
-            for row in duckdb.query(
-                "SELECT DISTINCT session_id FROM lancedb_sessions"
-            ).fetchall()
-        )
-        correlation_rate = (
-            len(session_ids & lancedb_session_ids) / len(session_ids) * 100
-            if session_ids
-            else 0
-        )
+    if activity and stats.id_count:
+        correlation_rate = activity["correlated_sessions"] / stats.id_count * 100
     else:
         correlation_rate = 0
 
-    missing_metadata = (
-        len([s for s in sessions if not s.get("sessiontype")]) / len(sessions) * 100
-    )
+    missing_metadata = stats.missing_type / stats.total * 100
 
     score = (correlation_rate + (100 - missing_metadata)) / 2
 
     return {
         "score": score,
-        "total_sessions": len(sessions),
+        "total_sessions": stats.total,
         "correlation_rate": correlation_rate,
         "missing_metadata": missing_metadata,
     }
 
 
-def analyze_communication_patterns(sessions, lancedb_sessions):
+def analyze_communication_patterns(stats, lancedb_sessions):
     """Analyze communication patterns and behavioral insights"""
-    if not sessions:
+    if not stats.total:
         return {"session_types": {}, "behavioral_insights": {}}
 
     # Session types
-    session_types = Counter(
-        session.get("sessiontype", "Unknown") for session in sessions
-    )
+    session_types = stats.type_counts
 
     # Basic behavioral insights
     behavioral_insights = {
-        "total_communications": len(sessions),
+        "total_communications": stats.total,
         "primary_type": session_types.most_common(1)[0][0]
         if session_types
         else "Unknown",
@@ -130,156 +489,118 @@ def analyze_communication_patterns(sessions, lancedb_sessions):
     }
 
 
-def identify_key_players(sessions, lancedb_sessions):
+def identify_key_players(activity):
     """Identify key players and communication networks"""
-    if not lancedb_sessions:
+    if not activity:
         return {"top_players": [], "network_insights": {}}
 
-    try:
-        # Get session activity
-        session_activity = duckdb.query("""
-            SELECT session_id, COUNT(*) as message_count
-            FROM lancedb_sessions
-            GROUP BY session_id
-            ORDER BY message_count DESC
-            LIMIT 10
-        """).fetchall()
-
-        top_players = []
-        for session_id, count in session_activity:
-            # Find session type for this session
-            session_type = "Unknown"
-            for session in sessions:
-                if session.get("sessionguid") == session_id:
-                    session_type = session.get("sessiontype", "Unknown")
-                    break
-
-            top_players.append(
-                {
-                    "id": session_id,
-                    "message_count": count,
-                    "session_type": session_type,
-                    "percentage": (count / sum(c for _, c in session_activity)) * 100,
-                }
-            )
+    session_activity = activity["top_sessions"]
+    total_count = sum(count for _, count, _ in session_activity)
+
+    top_players = []
+    for session_id, count, session_type in session_activity:
+        top_players.append(
+            {
+                "id": session_id,
+                "message_count": count,
+                "session_type": session_type,
+                "percentage": (count / total_count) * 100,
+            }
+        )
 
-        return {
-            "top_players": top_players,
-            "network_insights": {
-                "total_active_sessions": len(session_activity),
-                "top_communicator_percentage": top_players[0]["percentage"]
-                if top_players
-                else 0,
-            },
-        }
-    except Exception:
-        return {"top_players": [], "network_insights": {}}
+    return {
+        "top_players": top_players,
+        "network_insights": {
+            "total_active_sessions": len(session_activity),
+            "top_communicator_percentage": top_players[0]["percentage"]
+            if top_players
+            else 0,
+        },
+    }
 
 
-def analyze_content_intelligence(lancedb_sessions):
+def analyze_content_intelligence(con):
     """Analyze content for keywords and patterns"""
-    if not lancedb_sessions:
+    if con is None:
         return {"keywords": [], "patterns": {}}
 
     try:
-        # Get sample content
-        content_sample = duckdb.query("""
-            SELECT text
+        # Get sample content; it is small, so it is materialized once and
+        # every query below runs against it instead of the dataset
+        content_sample = con.sql("""
+            SELECT lower(text) as text
             FROM lancedb_sessions
             WHERE length(text) > 10
             LIMIT 1000
-        """).fetchall()
+        """).arrow()
 
-        if not content_sample:
+        if not content_sample.num_rows:
             return {"keywords": [], "patterns": {}}
+        con.register("content_sample", content_sample)
 
-        # Simple keyword extraction
-        all_text = " ".join(row[0].lower() for row in content_sample)
-        words = all_text.split()
+        # Tokenize in DuckDB into exactly the words str.split() would give
+        words_cte = """
+            WITH words AS (
+                SELECT unnest(regexp_extract_all(text, $word_pattern)) as word
+                FROM content_sample
+            )
+        """
 
         # Filter common words and get meaningful keywords
-        common_words = {
-            "the",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "by",
-            "a",
-            "an",
-            "is",
-            "are",
-            "was",
-            "were",
-            "been",
-            "be",
-            "have",
-            "has",
-            "had",
-            "do",
-            "does",
-            "did",
-            "will",
-            "would",
-            "could",
-            "should",
-            "may",
-            "might",
-            "must",
-            "can",
-            "this",
-            "that",
-            "these",
-            "those",
-            "i",
-            "you",
-            "he",
-            "she",
-            "it",
-            "we",
-            "they",
-            "me",
-            "him",
-            "her",
-            "us",
-            "them",
-        }
-        meaningful_words = [
-            word for word in words if len(word) > 3 and word not in common_words
-        ]
-
-        keyword_counts = Counter(meaningful_words)
-        top_keywords = keyword_counts.most_common(10)
+        keyword_sql = (
+            words_cte
+            + """
+            SELECT word, COUNT(*) as count
+            FROM words
+            WHERE length(word) > 3 AND NOT list_contains($common_words, word)
+            GROUP BY word
+            ORDER BY count DESC, word
+            LIMIT 10
+        """
+        )
+        top_keywords = con.execute(
+            keyword_sql,
+            {"word_pattern": WORD_PATTERN, "common_words": list(COMMON_WORDS)},
+        ).fetchall()
+
+        word_stats_sql = (
+            words_cte
+            + """
+            SELECT COUNT(*) as total_words, COUNT(DISTINCT word) as unique_words
+            FROM words
+        """
+        )
+        total_words, unique_words = con.execute(
+            word_stats_sql, {"word_pattern": WORD_PATTERN}
+        ).fetchone()
 
         # Basic suspicious pattern detection
-        suspicious_terms = [
-            "cash",
-            "clean",
-            "phone",
-            "usual",
-            "place",
-            "meeting",
-            "urgent",
-            "delivery",
-        ]
-        suspicious_patterns = {}
-        for term in suspicious_terms:
-            count = all_text.count(term)
-            if count > 0:
-                suspicious_patterns[term] = count
+        # All terms are matched in one pass over each text by a single
+        # alternation, which RE2 runs as an automaton. No term can end where
+        # another begins, so the counts equal a separate str.count() per term.
+        suspicious_sql = """
+            SELECT term, COUNT(*) as count
+            FROM (
+                SELECT unnest(regexp_extract_all(text, $pattern)) as term
+                FROM content_sample
+            )
+            GROUP BY term
+        """
+        term_counts = dict(
+            con.execute(suspicious_sql, {"pattern": SUSPICIOUS_PATTERN}).fetchall()
+        )
+        suspicious_patterns = {
+            term: term_counts[term]
+            for term in SUSPICIOUS_TERMS
+            if term_counts.get(term, 0) > 0
+        }
 
         return {
             "keywords": top_keywords,
             "patterns": {
                 "suspicious_terms": suspicious_patterns,
-                "total_words": len(words),
-                "unique_words": len(set(words)),
+                "total_words": total_words,
+                "unique_words": unique_words,
             },
         }
     except Exception:
@@ -321,7 +642,11 @@ def generate_recommendations(data_quality, patterns, players, content):
 def create_html_dashboard(
     case_name, data_quality, patterns, players, content, recommendations
 ):
-    """Create HTML dashboard with embedded CSS and JavaScript"""
+    """Create HTML dashboard with embedded CSS and JavaScript
+
+    Yields the page section by section, so it can be written out as it is
+    rendered instead of being assembled in memory first.
+    """
 
     # Generate timestamp
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -338,141 +663,14 @@ def create_html_dashboard(
         quality_color = "#dc3545"  # Red
         quality_status = "NEEDS ATTENTION"
 
-    # Create HTML content
-    html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>🔍 {case_name.upper()} - Investigation Dashboard</title>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: #333;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 2.5em;
-            font-weight: 700;
-        }}
-        .header p {{
-            margin: 10px 0 0 0;
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-        .section {{
-            padding: 30px;
-            border-bottom: 1px solid #eee;
-        }}
-        .section:last-child {{
-            border-bottom: none;
-        }}
-        .section h2 {{
-            margin: 0 0 20px 0;
-            font-size: 1.8em;
-            color: #2a5298;
-        }}
-        .data-quality {{
-            background: #f8f9fa;
-        }}
-        .quality-score {{
-            font-size: 3em;
-            font-weight: bold;
-            color: {quality_color};
-            text-align: center;
-            margin: 20px 0;
-        }}
-        .quality-details {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-top: 20px;
-        }}
-        .quality-item {{
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-top: 20px;
-        }}
-        .stat-card {{
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 8px;
-            border-left: 4px solid #2a5298;
-        }}
-        .stat-number {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #2a5298;
-        }}
-        .players-list {{
-            margin-top: 20px;
-        }}
-        .player-item {{
-            background: #f8f9fa;
-            padding: 15px;
-            margin: 10px 0;
-            border-radius: 8px;
-            border-left: 4px solid #28a745;
-        }}
-        .keywords-container {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            margin-top: 20px;
-        }}
-        .keyword {{
-            background: #e9ecef;
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-weight: 500;
-        }}
-        .suspicious-keyword {{
-            background: #fff3cd;
-            border: 1px solid #ffc107;
-        }}
-        .recommendations {{
-            background: #e7f3ff;
-        }}
-        .recommendation {{
-            background: white;
-            padding: 15px;
-            margin: 10px 0;
-            border-radius: 8px;
-            border-left: 4px solid #007bff;
-        }}
-        .footer {{
-            text-align: center;
-            padding: 20px;
-            background: #f8f9fa;
-            color: #666;
-        }}
-    </style>
-</head>
-<body>
+    # Hand the page out in pieces; the caller writes each one as it arrives,
+    # so the full page is never held in memory
+    yield (
+        DASHBOARD_HEAD.substitute(
+            case_name=case_name.upper(), quality_color=quality_color
+        )
+    )
+    yield f"""<body>
     <div class="container">
         <header class="header">
             <h1>🔍 OPERATION {case_name.upper()} - Investigation Dashboard</h1>
@@ -525,21 +723,21 @@ def create_html_dashboard(
 
     # Add top players
     for i, player in enumerate(players["top_players"][:5], 1):
-        html_content += f"""
+        yield f"""
                 <div class="player-item">
                     <strong>{i}. Session {player["id"][:8]}...</strong> - {player["message_count"]:,} messages ({player["percentage"]:.1f}%) - {player["session_type"]}
                 </div>
 """
 
     if not players["top_players"]:
-        html_content += """
+        yield """
                 <div class="player-item">
                     <strong>No player data available</strong> - LanceDB connection needed for detailed analysis
                 </div>
 """
 
     # Continue with patterns and content sections
-    html_content += """
+    yield """
             </div>
         </section>
         
@@ -549,18 +747,17 @@ def create_html_dashboard(
 """
 
     # Add session type breakdown
+    total_communications = patterns["behavioral_insights"]["total_communications"]
     for session_type, count in patterns["session_types"].items():
-        percentage = (
-            count / patterns["behavioral_insights"]["total_communications"]
-        ) * 100
-        html_content += f"""
+        percentage = (count / total_communications) * 100
+        yield f"""
                 <div class="stat-card">
                     <div class="stat-number">{count:,}</div>
                     <div>{session_type} ({percentage:.1f}%)</div>
                 </div>
 """
 
-    html_content += """
+    yield """
             </div>
         </section>
         
@@ -570,33 +767,33 @@ def create_html_dashboard(
 
     # Add keywords
     if content["keywords"]:
-        html_content += """
+        yield """
             <h3>Top Keywords</h3>
             <div class="keywords-container">
 """
         for keyword, count in content["keywords"]:
-            html_content += f"""
+            yield f"""
                 <span class="keyword">{html.escape(keyword)} ({count})</span>
 """
-        html_content += """
+        yield """
             </div>
 """
 
     # Add suspicious patterns
     if content["patterns"].get("suspicious_terms"):
-        html_content += """
+        yield """
             <h3>Suspicious Patterns</h3>
             <div class="keywords-container">
 """
         for term, count in content["patterns"]["suspicious_terms"].items():
-            html_content += f"""
+            yield f"""
                 <span class="keyword suspicious-keyword">⚠️ "{term}" ({count})</span>
 """
-        html_content += """
+        yield """
             </div>
 """
 
-    html_content += """
+    yield """
         </section>
         
         <section class="section recommendations">
@@ -605,13 +802,13 @@ def create_html_dashboard(
 
     # Add recommendations
     for rec in recommendations:
-        html_content += f"""
+        yield f"""
             <div class="recommendation">
                 {html.escape(rec)}
             </div>
 """
 
-    html_content += f"""
+    yield f"""
         </section>
         
         <footer class="footer">
@@ -623,8 +820,6 @@ def create_html_dashboard(
 </html>
 """
 
-    return html_content
-
 
 def generate_terminal_summary(
     case_name, data_quality, patterns, players, content, recommendations
@@ -697,12 +892,12 @@ Examples:
             f"🔍 COMPARISON MODE: {os.path.basename(case1_dir)} vs {os.path.basename(case2_dir)}"
         )
 
-        # Load both cases
-        sessions1 = load_sessions_data(case1_dir)
-        sessions2 = load_sessions_data(case2_dir)
+        # Count both cases; only the totals are needed, so nothing is kept
+        session_count1 = sum(1 for _ in iter_sessions(case1_dir))
+        session_count2 = sum(1 for _ in iter_sessions(case2_dir))
 
-        print(f"📊 {os.path.basename(case1_dir)}: {len(sessions1)} sessions")
-        print(f"📊 {os.path.basename(case2_dir)}: {len(sessions2)} sessions")
+        print(f"📊 {os.path.basename(case1_dir)}: {session_count1} sessions")
+        print(f"📊 {os.path.basename(case2_dir)}: {session_count2} sessions")
 
         # Generate basic comparison dashboard
         comparison_html = f"""<!DOCTYPE html>
@@ -722,11 +917,11 @@ Examples:
     <div class="comparison">
         <div class="case">
             <h2>{os.path.basename(case1_dir)}</h2>
-            <p>Sessions: {len(sessions1)}</p>
+            <p>Sessions: {session_count1}</p>
         </div>
         <div class="case">
             <h2>{os.path.basename(case2_dir)}</h2>
-            <p>Sessions: {len(sessions2)}</p>
+            <p>Sessions: {session_count2}</p>
         </div>
     </div>
 </body>
@@ -734,8 +929,8 @@ Examples:
 """
 
         # Save comparison dashboard
-        with open("comparison_dashboard.html", "w") as f:
-            f.write(comparison_html)
+        with open("comparison_dashboard.html", "wb") as f:
+            f.write(comparison_html.encode("utf-8"))
 
         print("✅ Comparison dashboard generated: comparison_dashboard.html")
         return 0
@@ -751,15 +946,18 @@ Examples:
 
     print(f"🔍 Analyzing case: {case_name}")
 
-    # Load data
-    sessions = load_sessions_data(case_dir)
-    table, lancedb_sessions = load_lancedb_data(case_dir)
+    # Load data; the LanceDB side runs alongside the sessions file scan and
+    # hands its connection back only once it is done with it
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        lancedb_analysis = executor.submit(open_case_analysis, case_dir)
+        stats = scan_sessions(iter_sessions(case_dir))
+        con, lancedb_sessions, content = lancedb_analysis.result()
 
     # Analyze data
-    data_quality = calculate_data_quality(sessions, lancedb_sessions)
-    patterns = analyze_communication_patterns(sessions, lancedb_sessions)
-    players = identify_key_players(sessions, lancedb_sessions)
-    content = analyze_content_intelligence(lancedb_sessions)
+    activity = analyze_session_activity(stats, con)
+    data_quality = calculate_data_quality(stats, activity)
+    patterns = analyze_communication_patterns(stats, lancedb_sessions)
+    players = identify_key_players(activity)
     recommendations = generate_recommendations(data_quality, patterns, players, content)
 
     if args.summary:
@@ -770,13 +968,14 @@ Examples:
         print(summary)
     else:
         # Generate HTML dashboard
-        html_content = create_html_dashboard(
+        html_sections = create_html_dashboard(
             case_name, data_quality, patterns, players, content, recommendations
         )
 
         dashboard_path = os.path.join(case_dir, "investigation_dashboard.html")
-        with open(dashboard_path, "w") as f:
-            f.write(html_content)
+        # Binary mode: no locale-dependent encoding or newline translation
+        with open(dashboard_path, "wb") as f:
+            f.writelines(section.encode("utf-8") for section in html_sections)
 
         print(f"✅ Investigation dashboard generated: {dashboard_path}")
 
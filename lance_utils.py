@@ -0,0 +1,16 @@
+"""
+Helpers shared by the LanceDB analysis scripts
+"""
+
+# A run of characters that str.split() would keep together as one word. RE2's
+# \s only covers ASCII blanks, so the rest of Python's whitespace is listed.
+# Counting its matches in DuckDB gives exactly len(text.split()).
+WORD_PATTERN = r"[^\s\v\x1c-\x1f\x85\p{Z}]+"
+
+
+def load_cols(table, cols, limit=None):
+    """Read only the given columns of a LanceDB table as an Arrow table
+
+    Columns that are not listed (notably the vectors) are never read.
+    """
+    return table.to_lance().scanner(columns=cols, limit=limit).to_table()
@@ -7,9 +7,23 @@ Clean, Excel-style interface focused on readable data
 import streamlit as st
 import lancedb
 import duckdb
+import gzip
+import io
+import re
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import argparse
-from datetime import datetime
+
+# Shorter search terms match too much of the table to be useful
+MIN_SEARCH_LENGTH = 3
+
+# SQL expression for the readable_time column; DuckDB renders it in the local
+# time zone, like datetime.fromtimestamp
+READABLE_TIME_SQL = "strftime(to_timestamp(timestamp), '%Y-%m-%d %H:%M:%S')"
+
+# Rows per Arrow batch when streaming a full-table export
+EXPORT_BATCH_ROWS = 65536
 
 st.set_page_config(
     page_title="LanceDB Call Transcript Browser",
@@ -68,8 +82,7 @@ def load_table_metadata():
     except:
         total_rows = None
 
-    # Get sample for analysis
-    sample = table.to_pandas().head(100)
+    all_columns = table.schema.names
 
     # Define columns of interest (hide technical columns)
     display_columns = [
@@ -80,16 +93,31 @@ def load_table_metadata():
         "session_type",
         "content_type",
     ]
-    available_columns = [col for col in display_columns if col in sample.columns]
+    available_columns = [col for col in display_columns if col in all_columns]
+
+    # Statistics over the whole table; DuckDB only scans the columns they use
+    con = connect_duckdb(
+        st.session_state.data_dir, st.session_state.table_name, table.version
+    )
+
+    unique_sessions = 0
+    if "session_id" in all_columns:
+        unique_sessions = con.execute(
+            "SELECT COUNT(DISTINCT session_id) FROM lance_data"
+        ).fetchone()[0]
+
+    avg_text_length = None
+    if "text" in all_columns:
+        avg_text_length = con.execute(
+            "SELECT AVG(LENGTH(text)) FROM lance_data"
+        ).fetchone()[0]
 
     return {
         "total_rows": total_rows,
-        "all_columns": list(sample.columns),
+        "all_columns": all_columns,
         "display_columns": available_columns,
-        "sample": sample,
-        "unique_sessions": sample["session_id"].nunique()
-        if "session_id" in sample.columns
-        else 0,
+        "unique_sessions": unique_sessions,
+        "avg_text_length": avg_text_length,
     }
 
 
@@ -99,12 +127,82 @@ def get_table():
     return db.open_table(st.session_state.table_name)
 
 
-def convert_timestamp(timestamp):
-    """Convert Unix timestamp to readable format"""
-    try:
-        return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-    except:
-        return str(timestamp)
+@st.cache_resource
+def connect_duckdb(data_dir, table_name, version):
+    """DuckDB connection with the table's Lance dataset registered as lance_data
+
+    Cached per table version, so the dataset is registered once and a new
+    connection is only made after the table changes.
+    """
+    con = duckdb.connect()
+    con.register("lance_data", connect_db(data_dir).open_table(table_name).to_lance())
+    return con
+
+
+def table_to_csv(data):
+    """Serialize an Arrow table to CSV bytes with pyarrow's C++ writer
+
+    That writer has no representation for nested columns such as the
+    embedding vector, so tables with one are written through pandas instead.
+    """
+    if any(pa.types.is_nested(field.type) for field in data.schema):
+        return data.to_pandas().to_csv(index=False).encode()
+
+    buffer = io.BytesIO()
+    pacsv.write_csv(data, buffer)
+    return buffer.getvalue()
+
+
+def gzip_csv(data):
+    """Gzip CSV text or bytes for download
+
+    Level 1 costs little CPU and still shrinks transcript text several times,
+    which is what the browser has to transfer.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    return gzip.compress(data, compresslevel=1, mtime=0)
+
+
+def stream_csv_gzip(reader):
+    """Write an Arrow record batch reader as gzipped CSV bytes, batch by batch
+
+    Only one batch and the compressed output are in memory at a time, never
+    the whole table or its uncompressed CSV.
+    """
+    buffer = io.BytesIO()
+    with (
+        gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=1, mtime=0) as gz,
+        pacsv.CSVWriter(gz, reader.schema) as writer,
+    ):
+        for batch in reader:
+            writer.write_batch(batch)
+    return buffer.getvalue()
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def read_page(data_dir, table_name, version, offset, page_size, columns):
+    """One page of rows, cached per table version
+
+    Reruns that leave the page alone (widget changes elsewhere, tab switches)
+    reuse the cached frame instead of reading and converting it again.
+    """
+    table = connect_db(data_dir).open_table(table_name)
+
+    # Only the rows and columns of this page are read and decoded
+    page = (
+        table.to_lance()
+        .scanner(columns=columns, limit=page_size, offset=offset)
+        .to_table()
+    )
+    df = page.to_pandas(types_mapper=pd.ArrowDtype)
+
+    # Convert timestamp if present, in one vectorized DuckDB pass
+    if "timestamp" in df.columns:
+        readable = duckdb.sql(f"SELECT {READABLE_TIME_SQL} AS readable_time FROM page")
+        df["readable_time"] = readable.fetchnumpy()["readable_time"]
+
+    return df
 
 
 def get_data_page(table, page_num, page_size, columns=None):
@@ -112,54 +210,84 @@ def get_data_page(table, page_num, page_size, columns=None):
     offset = (page_num - 1) * page_size
 
     try:
-        df = table.to_pandas()
-
+        # readable_time is derived in read_page, not read from the table
         if columns:
-            df = df[columns]
-
-        # Convert timestamp if present
-        if "timestamp" in df.columns:
-            df["readable_time"] = df["timestamp"].apply(convert_timestamp)
-
-        return df.iloc[offset : offset + page_size]
+            columns = [col for col in columns if col != "readable_time"]
+
+        return read_page(
+            st.session_state.data_dir,
+            st.session_state.table_name,
+            table.version,
+            offset,
+            page_size,
+            columns,
+        )
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
 
-def aggregate_sessions(table):
-    """Get aggregated session texts"""
-    try:
-        lance_data = table.to_lance()
-
-        sql = """
-        SELECT 
-            session_id,
-            FIRST(timestamp) as first_timestamp,
-            STRING_AGG(text, ' ') as full_text,
-            COUNT(*) as chunk_count,
-            FIRST(target) as participant,
-            FIRST(session_type) as session_type
-        FROM 
-            (SELECT * FROM lance_data ORDER BY timestamp, chunk_id ASC) 
-        GROUP BY 
-            session_id
-        ORDER BY first_timestamp DESC
-        """
+@st.cache_resource(show_spinner=False)
+def session_transcripts(data_dir, table_name, version):
+    """Aggregated session texts, cached per table version
 
-        result = duckdb.query(sql).to_df()
+    The aggregation scans the whole table, so it runs once per version rather
+    than on every rerun of the Session Transcripts tab. The frame holds every
+    transcript, so it is cached as a shared resource instead of being pickled
+    on each access; callers must not modify it.
+    """
+    con = connect_duckdb(data_dir, table_name, version)
+
+    sql = """
+    SELECT 
+        session_id,
+        MIN(timestamp) as first_timestamp,
+        STRING_AGG(text, ' ' ORDER BY timestamp, chunk_id) as full_text,
+        COUNT(*) as chunk_count,
+        arg_min(target, (timestamp, chunk_id)) as participant,
+        arg_min(session_type, (timestamp, chunk_id)) as session_type,
+        strftime(to_timestamp(MIN(timestamp)), '%Y-%m-%d %H:%M:%S') as readable_time
+    FROM 
+        lance_data
+    GROUP BY 
+        session_id
+    ORDER BY first_timestamp DESC
+    """
 
-        # Convert timestamps
-        if "first_timestamp" in result.columns:
-            result["readable_time"] = result["first_timestamp"].apply(convert_timestamp)
+    return con.execute(sql).fetch_arrow_table().to_pandas(types_mapper=pd.ArrowDtype)
 
-        return result
 
+def aggregate_sessions(table):
+    """Get aggregated session texts"""
+    try:
+        return session_transcripts(
+            st.session_state.data_dir, st.session_state.table_name, table.version
+        )
     except Exception as e:
         st.error(f"Error aggregating sessions: {e}")
         return pd.DataFrame()
 
 
+@st.cache_resource(ttl=300, max_entries=32, show_spinner=False)
+def run_search(data_dir, table_name, version, search_term):
+    """Rows whose text matches the search term, cached per table version
+
+    The filter runs inside DuckDB, so only matching rows reach pandas. Like
+    str.contains, the term is a case-insensitive regular expression. Short
+    terms can match most of the table, so like session_transcripts the result
+    is a shared resource that callers must not modify.
+    """
+    con = connect_duckdb(data_dir, table_name, version)
+    return (
+        con.execute(
+            "SELECT * FROM lance_data WHERE regexp_matches(text, $1, 'i')",
+            [search_term],
+        )
+        .fetch_arrow_table()
+        .to_pandas(types_mapper=pd.ArrowDtype)
+    )
+
+
 # Main Application
 def main():
     # Header
@@ -192,9 +320,8 @@ def main():
     with col3:
         st.metric("Data Columns", len(metadata["all_columns"]))
     with col4:
-        if metadata["sample"]["text"].notna().any():
-            avg_length = metadata["sample"]["text"].str.len().mean()
-            st.metric("Avg Text Length", f"{avg_length:.0f} chars")
+        if metadata["avg_text_length"] is not None:
+            st.metric("Avg Text Length", f"{metadata['avg_text_length']:.0f} chars")
 
     st.markdown("---")
 
@@ -257,6 +384,8 @@ def main():
         with nav_col5:
             if st.button("Refresh"):
                 st.cache_data.clear()
+                session_transcripts.clear()
+                run_search.clear()
                 st.rerun()
 
         # Data display
@@ -325,9 +454,13 @@ def main():
             col1, col2 = st.columns([3, 1])
 
             with col1:
-                session_options = sessions_df.apply(
-                    lambda row: f"{row['session_id']} - {row['participant']} ({row['readable_time']})",
-                    axis=1,
+                session_options = (
+                    sessions_df["session_id"].astype(str)
+                    + " - "
+                    + sessions_df["participant"].astype(str)
+                    + " ("
+                    + sessions_df["readable_time"].astype(str)
+                    + ")"
                 ).tolist()
 
                 selected_session_idx = st.selectbox(
@@ -376,9 +509,9 @@ def main():
             sessions_csv = sessions_df.to_csv(index=False)
             st.download_button(
                 label="Download All Sessions as CSV",
-                data=sessions_csv,
-                file_name="all_sessions.csv",
-                mime="text/csv",
+                data=gzip_csv(sessions_csv),
+                file_name="all_sessions.csv.gz",
+                mime="application/gzip",
             )
         else:
             st.error("Could not aggregate sessions")
@@ -396,27 +529,36 @@ def main():
                 current_data = get_data_page(
                     table, page_num, page_size, metadata["display_columns"]
                 )
-                csv_data = current_data.to_csv(index=False)
+                csv_data = table_to_csv(
+                    pa.Table.from_pandas(current_data, preserve_index=False)
+                )
                 st.download_button(
                     label="Download Current Page",
-                    data=csv_data,
-                    file_name=f"page_{page_num}_data.csv",
-                    mime="text/csv",
+                    data=gzip_csv(csv_data),
+                    file_name=f"page_{page_num}_data.csv.gz",
+                    mime="application/gzip",
                 )
 
             # Export all readable data
             if st.button("Export All Readable Data"):
-                all_data = table.to_pandas()[metadata["display_columns"]]
-                if "timestamp" in all_data.columns:
-                    all_data["readable_time"] = all_data["timestamp"].apply(
-                        convert_timestamp
-                    )
-                csv_data = all_data.to_csv(index=False)
+                # Projected and timestamp-converted in DuckDB, then streamed
+                # to CSV in Arrow batches without a pandas round-trip
+                columns = [f'"{col}"' for col in metadata["display_columns"]]
+                if "timestamp" in metadata["display_columns"]:
+                    columns.append(f"{READABLE_TIME_SQL} as readable_time")
+                con = connect_duckdb(
+                    st.session_state.data_dir,
+                    st.session_state.table_name,
+                    table.version,
+                )
+                all_data = con.execute(
+                    f"SELECT {', '.join(columns)} FROM lance_data"
+                ).fetch_record_batch(EXPORT_BATCH_ROWS)
                 st.download_button(
                     label="Download All Data",
-                    data=csv_data,
-                    file_name="all_transcript_data.csv",
-                    mime="text/csv",
+                    data=stream_csv_gzip(all_data),
+                    file_name="all_transcript_data.csv.gz",
+                    mime="application/gzip",
                 )
 
         with export_col2:
@@ -430,13 +572,15 @@ def main():
 
             if export_columns:
                 if st.button("Generate Custom Export"):
-                    custom_data = table.to_pandas()[export_columns]
-                    csv_data = custom_data.to_csv(index=False)
+                    custom_data = (
+                        table.to_lance().scanner(columns=export_columns).to_table()
+                    )
+                    csv_data = table_to_csv(custom_data)
                     st.download_button(
                         label="Download Custom Export",
-                        data=csv_data,
-                        file_name="custom_export.csv",
-                        mime="text/csv",
+                        data=gzip_csv(csv_data),
+                        file_name="custom_export.csv.gz",
+                        mime="application/gzip",
                     )
 
 
@@ -444,32 +588,40 @@ def main():
 with st.sidebar:
     st.header("Search & Filter")
 
-    search_term = st.text_input("Search in transcripts:")
+    # A form only reruns the search on submit, not on every edit of the box
+    with st.form("search"):
+        search_term = st.text_input("Search in transcripts:")
+        st.form_submit_button("Search")
 
-    if search_term:
+    if search_term and len(search_term) < MIN_SEARCH_LENGTH:
+        st.info(f"Enter at least {MIN_SEARCH_LENGTH} characters to search")
+    elif search_term:
         with st.spinner("Searching..."):
             table = get_table()
-            all_data = table.to_pandas()
 
-            if "text" in all_data.columns:
-                matches = all_data[
-                    all_data["text"].str.contains(search_term, case=False, na=False)
-                ]
+            if "text" in table.schema.names:
+                matches = run_search(
+                    st.session_state.data_dir,
+                    st.session_state.table_name,
+                    table.version,
+                    search_term,
+                )
 
                 if not matches.empty:
                     st.success(f"Found {len(matches)} matches")
 
                     # Show preview of matches
-                    for idx, (_, row) in enumerate(matches.head(5).iterrows()):
+                    term_pattern = re.compile(re.escape(search_term), re.IGNORECASE)
+                    for idx, row in enumerate(matches.head(5).to_dict("records")):
                         with st.expander(
                             f"Match {idx + 1}: {row.get('session_id', 'Unknown')}"
                         ):
                             text = row["text"]
                             # Highlight search term
-                            start = text.lower().find(search_term.lower())
-                            if start != -1:
+                            match = term_pattern.search(text)
+                            if match:
                                 preview = text[
-                                    max(0, start - 50) : start + len(search_term) + 50
+                                    max(0, match.start() - 50) : match.end() + 50
                                 ]
                                 st.write(f"...{preview}...")
 
@@ -477,9 +629,9 @@ with st.sidebar:
                     csv_results = matches.to_csv(index=False)
                     st.download_button(
                         label="Download Search Results",
-                        data=csv_results,
-                        file_name=f"search_results_{search_term}.csv",
-                        mime="text/csv",
+                        data=gzip_csv(csv_results),
+                        file_name=f"search_results_{search_term}.csv.gz",
+                        mime="application/gzip",
                     )
                 else:
                     st.warning("No matches found")
@@ -7,6 +7,9 @@ Uses the existing whiskey_jack table in current directory
 import argparse
 import lancedb
 import duckdb
+import pyarrow.compute as pc
+
+from lance_utils import load_cols
 
 
 def explore_existing_table(table_name="whiskey_jack", data_dir="."):
@@ -43,7 +46,8 @@ def explore_existing_table(table_name="whiskey_jack", data_dir="."):
 
         # Sample data
         print("\n👀 Sample data (first 5 rows):")
-        sample = table.to_pandas().head(5)
+        sample_table = load_cols(table, table.schema.names, limit=5)
+        sample = sample_table.to_pandas()
         print(sample.to_string())
 
         # Check for expected columns
@@ -109,25 +113,27 @@ def explore_existing_table(table_name="whiskey_jack", data_dir="."):
             print(f"Found: {found_cols}")
             print("Need: session_id, timestamp, text")
 
-        # Show some statistics
-        if not sample.empty:
+        # Show some statistics, computed with Arrow kernels on the sample
+        if sample_table.num_rows:
             print("\n📈 Data Statistics:")
-            if "session_id" in sample.columns:
-                unique_sessions = sample["session_id"].nunique()
+            if "session_id" in sample_table.column_names:
+                session_ids = sample_table["session_id"]
+                unique_sessions = pc.count_distinct(session_ids).as_py()
                 print(f"Unique sessions in sample: {unique_sessions}")
-                print(f"Sample session IDs: {list(sample['session_id'].unique()[:5])}")
+                print(f"Sample session IDs: {pc.unique(session_ids)[:5].to_pylist()}")
 
-            if "timestamp" in sample.columns:
+            if "timestamp" in sample_table.column_names:
+                timestamp_range = pc.min_max(sample_table["timestamp"])
                 print(
-                    f"Timestamp range: {sample['timestamp'].min()} to {sample['timestamp'].max()}"
+                    f"Timestamp range: {timestamp_range['min'].as_py()} to {timestamp_range['max'].as_py()}"
                 )
 
-            if "text" in sample.columns:
-                text_lengths = sample["text"].str.len()
+            if "text" in sample_table.column_names:
+                text_lengths = pc.utf8_length(sample_table["text"])
                 print("Text length stats:")
-                print(f"  - Min: {text_lengths.min()} chars")
-                print(f"  - Max: {text_lengths.max()} chars")
-                print(f"  - Mean: {text_lengths.mean():.0f} chars")
+                print(f"  - Min: {pc.min(text_lengths).as_py()} chars")
+                print(f"  - Max: {pc.max(text_lengths).as_py()} chars")
+                print(f"  - Mean: {pc.mean(text_lengths).as_py():.0f} chars")
 
         return True
 
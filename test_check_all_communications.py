@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the NDJSON session type tally in check_all_communications.py
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from check_all_communications import tally_session_types
+
+
+class TestSessionTypeTally:
+    """Test counting session types from raw NDJSON"""
+
+    def test_damaged_and_untyped_lines(self, capsys):
+        """Concatenated lines are reported and skipped, untyped objects counted"""
+        content = [
+            (
+                '{"sessionguid": "g1", "sessiontype": "Telephony"}'
+                '{"sessionguid": "g2", "sessiontype": "Messaging"}'
+            ),
+            '{"sessionguid": "g3", "sessiontype": "Email"}',
+            '{"sessiontype": "Email"}',
+            "{}",
+        ]
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".ndjson"
+        ) as temp_file:
+            temp_file.write("\n".join(content) + "\n")
+
+        try:
+            session_types, examples_by_type = tally_session_types(temp_file.name)
+        finally:
+            os.unlink(temp_file.name)
+
+        # The concatenated line holds no countable session until it is fixed
+        assert session_types == {"Email": 2, "Unknown": 1}
+        assert examples_by_type == {"Email": ["g3", None], "Unknown": [None]}
+
+        warnings = capsys.readouterr().out.splitlines()
+        assert len(warnings) == 1
+        assert warnings[0].startswith("Warning: Skipping line 1 due to JSON error")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
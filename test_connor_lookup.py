@@ -33,6 +33,12 @@ Examples:
         help="Directory containing LanceDB data (default: current directory)",
     )
 
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="Build a session_id scalar index for the lookups and exit",
+    )
+
     args = parser.parse_args()
 
     print("🧪 Testing Connor's Lookup Approach")
@@ -42,32 +48,59 @@ Examples:
     # Connect to LanceDB
     db = lancedb.connect(args.data_dir)
     table = db.open_table(args.table)
-    whiskey_table = table.to_lance()
 
-    # Create Connor's session text lookup
+    # A scalar index turns the session_id filter below into an index lookup
+    # instead of a scan of every fragment. Lance uses one automatically when it
+    # exists; building it writes a new table version, so only on --build-index
+    if args.build_index:
+        if any("session_id" in index.columns for index in table.list_indices()):
+            print("✅ session_id scalar index already exists")
+            return
+        try:
+            table.create_scalar_index("session_id", index_type="BTREE", replace=False)
+            print("✅ Built session_id scalar index")
+        except (RuntimeError, ValueError) as e:
+            print(f"⚠️  Could not build session_id index: {e}")
+        return
+
+    # Test with our matched Neo4j session GUIDs
+    matched_guids = [
+        "07792de9-41b7-4cfe-abfb-fe6a4d9dc601",
+        "081da27f-8d7e-4ba4-861c-13d7d7233b49",
+        "00fdfea0-8c72-487a-b726-513f6fafb338",
+        "0b595ec8-e76a-484a-9005-ef62f50d8e09",
+    ]
+
+    # Create Connor's session text lookup, aggregating only the matched sessions
     print("Creating Connor's session_text_lookup...")
+
+    # Lance applies the filter and column projection during the scan, so only
+    # the matched sessions' chunks are ever read
+    guid_list = ", ".join(f"'{guid}'" for guid in matched_guids)
+    whiskey_table = table.to_lance().to_table(
+        columns=["session_id", "text", "timestamp", "chunk_id"],
+        filter=f"session_id IN ({guid_list})",
+    )
+
     session_sql = """
     SELECT 
         session_id,
-        STRING_AGG(text, ' ') as text
+        STRING_AGG(text, ' ' ORDER BY timestamp, chunk_id) as text
     FROM 
-        (SELECT * FROM whiskey_table ORDER BY timestamp, chunk_id ASC) 
+        whiskey_table
     GROUP BY 
         session_id
     """
 
-    session_texts = duckdb.query(session_sql).fetchall()
-    session_text_lookup = {session_id: text for session_id, text in session_texts}
-
-    print(f"✅ Created lookup for {len(session_text_lookup)} sessions")
+    session_texts = duckdb.query(session_sql).arrow()
+    session_text_lookup = dict(
+        zip(
+            session_texts.column("session_id").to_pylist(),
+            session_texts.column("text").to_pylist(),
+        )
+    )
 
-    # Test with our matched Neo4j session GUIDs
-    matched_guids = [
-        "07792de9-41b7-4cfe-abfb-fe6a4d9dc601",
-        "081da27f-8d7e-4ba4-861c-13d7d7233b49",
-        "00fdfea0-8c72-487a-b726-513f6fafb338",
-        "0b595ec8-e76a-484a-9005-ef62f50d8e09",
-    ]
+    print(f"✅ Created lookup for {len(session_text_lookup)} matched sessions")
 
     print("\n🔗 Testing Direct Lookup")
     print("-" * 50)
@@ -77,7 +110,7 @@ Examples:
         if transcript:
             word_count = len(transcript.split())
             char_count = len(transcript)
-            preview = transcript[:150] + "..." if len(transcript) > 150 else transcript
+            preview = transcript[:150] + "..." if char_count > 150 else transcript
             print(f"\n✅ Session: {guid}")
             print(f"   Words: {word_count}, Chars: {char_count}")
             print(f"   Text: {preview}")
@@ -7,73 +7,66 @@ Tests the flexible directory support feature (Issue #3)
 import pytest
 import tempfile
 import os
-import sys
-import subprocess
 import shutil
+import py_compile
 
 
 class TestDataDirSupport:
     """Test --data-dir argument support for all LanceDB scripts"""
 
-    def setup_method(self):
-        """Create temporary directory structure for testing"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_case_dir = os.path.join(self.temp_dir, "test_case")
-        os.makedirs(self.test_case_dir)
-
-        # Scripts to test
-        self.scripts = [
-            "export_for_neo4j.py",
-            "lancedb_data_dump.py",
-            "whiskey_jack_eda.py",
-            "analyze_data_model.py",
-            "lancedb_data_browser.py",
-            "check_all_communications.py",
-            "test_connor_lookup.py",
-        ]
-
-    def teardown_method(self):
+    # Scripts to test
+    scripts = (
+        "export_for_neo4j.py",
+        "lancedb_data_dump.py",
+        "whiskey_jack_eda.py",
+        "analyze_data_model.py",
+        "lancedb_data_browser.py",
+        "check_all_communications.py",
+        "test_connor_lookup.py",
+    )
+
+    @classmethod
+    def setup_class(cls):
+        """Create temporary directory structure once for the class"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.test_case_dir = os.path.join(cls.temp_dir, "test_case")
+        os.makedirs(cls.test_case_dir)
+
+    @classmethod
+    def teardown_class(cls):
         """Clean up temporary directories"""
-        shutil.rmtree(self.temp_dir)
+        shutil.rmtree(cls.temp_dir)
 
-    def test_all_scripts_accept_data_dir_argument(self):
+    def test_all_scripts_accept_data_dir_argument(self, script_help):
         """AC1: All scripts accept --data-dir argument"""
         for script in self.scripts:
             if os.path.exists(script):
-                result = subprocess.run(
-                    [sys.executable, script, "--help"], capture_output=True, text=True
-                )
+                exit_code, help_text = script_help(script)
 
                 # Should not fail and should mention --data-dir
-                assert result.returncode == 0, f"{script} help command failed"
-                assert "--data-dir" in result.stdout, (
+                assert exit_code == 0, f"{script} help command failed"
+                assert "--data-dir" in help_text, (
                     f"{script} missing --data-dir argument"
                 )
 
-    def test_backward_compatibility_maintained(self):
+    def test_backward_compatibility_maintained(self, script_help):
         """AC6: Existing users with current workflows work exactly as before"""
         # Test that scripts work without --data-dir (default behavior)
         for script in self.scripts:
             if os.path.exists(script):
-                result = subprocess.run(
-                    [sys.executable, script, "--help"], capture_output=True, text=True
-                )
+                exit_code, _ = script_help(script)
 
                 # Should work without --data-dir argument
-                assert result.returncode == 0, f"{script} backward compatibility broken"
+                assert exit_code == 0, f"{script} backward compatibility broken"
 
-    def test_export_default_output_changed(self):
+    def test_export_default_output_changed(self, script_help):
         """AC1: export_for_neo4j.py creates ./transcripts.json by default"""
         # This test should initially fail because current default is stdout
         if os.path.exists("export_for_neo4j.py"):
-            result = subprocess.run(
-                [sys.executable, "export_for_neo4j.py", "--help"],
-                capture_output=True,
-                text=True,
-            )
+            _, help_text = script_help("export_for_neo4j.py")
 
             # Should show transcripts.json as default, not stdout
-            assert "transcripts.json" in result.stdout, (
+            assert "transcripts.json" in help_text, (
                 "Default output should be transcripts.json"
             )
 
@@ -90,26 +83,20 @@ class TestDataDirSupport:
                 script_name = script.replace(".py", "")
                 try:
                     # This is a basic syntax check
-                    subprocess.run(
-                        [sys.executable, "-m", "py_compile", script],
-                        check=True,
-                        capture_output=True,
-                    )
-                except subprocess.CalledProcessError:
+                    py_compile.compile(script, doraise=True)
+                except py_compile.PyCompileError:
                     pytest.fail(f"{script} has syntax errors")
 
-    def test_help_text_shows_working_examples(self):
+    def test_help_text_shows_working_examples(self, script_help):
         """AC5: Help text shows working examples"""
         key_scripts = ["export_for_neo4j.py", "lancedb_data_dump.py"]
 
         for script in key_scripts:
             if os.path.exists(script):
-                result = subprocess.run(
-                    [sys.executable, script, "--help"], capture_output=True, text=True
-                )
+                _, help_text = script_help(script)
 
                 # Should show case-based examples
-                help_text = result.stdout.lower()
+                help_text = help_text.lower()
                 assert "case" in help_text or "directory" in help_text, (
                     f"{script} help missing case examples"
                 )
@@ -135,90 +122,73 @@ class TestDataDirSupport:
 class TestCaseBasedWorkflow:
     """Test case-based investigation workflow scenarios"""
 
-    def setup_method(self):
-        """Setup test case directories"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.case_alpha_dir = os.path.join(self.temp_dir, "case-alpha")
-        self.case_beta_dir = os.path.join(self.temp_dir, "case-beta")
-        os.makedirs(self.case_alpha_dir)
-        os.makedirs(self.case_beta_dir)
-
-    def teardown_method(self):
+    @classmethod
+    def setup_class(cls):
+        """Setup test case directories once for the class"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.case_alpha_dir = os.path.join(cls.temp_dir, "case-alpha")
+        cls.case_beta_dir = os.path.join(cls.temp_dir, "case-beta")
+        os.makedirs(cls.case_alpha_dir)
+        os.makedirs(cls.case_beta_dir)
+
+    @classmethod
+    def teardown_class(cls):
         """Clean up test directories"""
-        shutil.rmtree(self.temp_dir)
+        shutil.rmtree(cls.temp_dir)
 
-    def test_case_alpha_data_processing(self):
+    def test_case_alpha_data_processing(self, run_script):
         """AC2: User with case data in ./data/case-alpha/ can process it"""
         # This should initially fail - no --data-dir support yet
         if os.path.exists("export_for_neo4j.py"):
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "export_for_neo4j.py",
-                    "--data-dir",
-                    self.case_alpha_dir,
-                    "--table",
-                    "evidence_calls",
-                    "--help",  # Use help to avoid actual processing
-                ],
-                capture_output=True,
-                text=True,
+            exit_code, _ = run_script(
+                "export_for_neo4j.py",
+                "--data-dir",
+                self.case_alpha_dir,
+                "--table",
+                "evidence_calls",
+                "--help",  # Use help to avoid actual processing
             )
 
             # Should accept the arguments without error
-            assert result.returncode == 0, "Case-based workflow should be supported"
+            assert exit_code == 0, "Case-based workflow should be supported"
 
-    def test_secure_directory_access(self):
+    def test_secure_directory_access(self, run_script):
         """AC3: User with secure data in absolute path can access it"""
         secure_dir = os.path.join(self.temp_dir, "secure-investigation")
         os.makedirs(secure_dir)
 
         if os.path.exists("export_for_neo4j.py"):
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "export_for_neo4j.py",
-                    "--data-dir",
-                    secure_dir,
-                    "--table",
-                    "surveillance_data",
-                    "--help",  # Use help to avoid actual processing
-                ],
-                capture_output=True,
-                text=True,
+            exit_code, _ = run_script(
+                "export_for_neo4j.py",
+                "--data-dir",
+                secure_dir,
+                "--table",
+                "surveillance_data",
+                "--help",  # Use help to avoid actual processing
             )
 
             # Should accept absolute path arguments
-            assert result.returncode == 0, "Absolute path data-dir should be supported"
+            assert exit_code == 0, "Absolute path data-dir should be supported"
 
-    def test_custom_output_location(self):
+    def test_custom_output_location(self, run_script):
         """AC4: User can specify custom output location"""
         if os.path.exists("export_for_neo4j.py"):
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "export_for_neo4j.py",
-                    "-o",
-                    "custom-output.json",
-                    "--help",  # Use help to avoid actual processing
-                ],
-                capture_output=True,
-                text=True,
+            exit_code, _ = run_script(
+                "export_for_neo4j.py",
+                "-o",
+                "custom-output.json",
+                "--help",  # Use help to avoid actual processing
             )
 
             # Should accept custom output filename
-            assert result.returncode == 0, "Custom output filename should be supported"
+            assert exit_code == 0, "Custom output filename should be supported"
 
 
 class TestNDJSONDataRecovery:
     """Test NDJSON data recovery integration with main workflow"""
 
-    def test_fix_ndjson_tool_exists_and_works(self):
+    def test_fix_ndjson_tool_exists_and_works(self, run_script):
         """Test that fix_ndjson.py tool is available and functional"""
-        import subprocess
-        import tempfile
-        import os
-
         # Create test NDJSON with concatenated objects
         test_content = '{"id": 1, "type": "test"}{"id": 2, "type": "test"}\n{"id": 3, "type": "single"}\n'
 
@@ -228,34 +198,24 @@ class TestNDJSONDataRecovery:
 
         try:
             # Test dry run mode
-            result = subprocess.run(
-                [sys.executable, "fix_ndjson.py", test_file, "--dry-run"],
-                capture_output=True,
-                text=True,
-            )
+            exit_code, output = run_script("fix_ndjson.py", test_file, "--dry-run")
 
-            assert result.returncode == 0
-            assert "1 problematic lines" in result.stdout
-            assert "Would fix 1 lines" in result.stdout
+            assert exit_code == 0
+            assert "1 problematic lines" in output
+            assert "Would fix 1 lines" in output
 
         finally:
             os.unlink(test_file)
 
-    def test_check_all_communications_uses_fixed_file(self):
+    def test_check_all_communications_uses_fixed_file(self, script_help):
         """Test that analysis tools automatically use fixed NDJSON files"""
         # This validates the integration where check_all_communications.py
         # automatically detects and uses sessions_fixed.ndjson when available
-        import subprocess
-
-        result = subprocess.run(
-            [sys.executable, "check_all_communications.py", "--help"],
-            capture_output=True,
-            text=True,
-        )
+        exit_code, help_text = script_help("check_all_communications.py")
 
         # Should not crash and should show help
-        assert result.returncode == 0
-        assert "Check communication types correlation" in result.stdout
+        assert exit_code == 0
+        assert "Check communication types correlation" in help_text
 
 
 if __name__ == "__main__":
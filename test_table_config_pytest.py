@@ -4,8 +4,11 @@ Pytest version: Test configurable table names implementation
 """
 
 import subprocess
+import sys
 import pytest
 
+# Keep the help checks on one xdist worker so they share its script_help cache
+pytestmark = pytest.mark.xdist_group(name="help_checks")
 
 SCRIPTS = [
     "export_for_neo4j.py",
@@ -16,25 +19,20 @@ SCRIPTS = [
 
 
 @pytest.mark.parametrize("script_name", SCRIPTS)
-def test_script_help(script_name):
+def test_script_help(script_name, script_help):
     """Test that script shows --table option in help"""
-    result = subprocess.run(
-        ["python", script_name, "--help"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
+    exit_code, help_text = script_help(script_name)
 
-    assert result.returncode == 0, f"{script_name}: Help command failed"
-    assert "--table" in result.stdout, f"{script_name}: --table argument missing"
-    assert "whiskey_jack" in result.stdout.lower(), f"{script_name}: No default shown"
+    assert exit_code == 0, f"{script_name}: Help command failed"
+    assert "--table" in help_text, f"{script_name}: --table argument missing"
+    assert "whiskey_jack" in help_text.lower(), f"{script_name}: No default shown"
 
 
 @pytest.mark.parametrize("script_name", SCRIPTS)
 def test_backward_compatibility(script_name):
     """Test that script works without arguments (backward compatibility)"""
     result = subprocess.run(
-        ["python", script_name], capture_output=True, text=True, timeout=15
+        [sys.executable, script_name], capture_output=True, text=True, timeout=15
     )
 
     # Should NOT have argument parsing errors (backward compatibility)
@@ -45,24 +43,19 @@ def test_backward_compatibility(script_name):
 
 
 @pytest.mark.parametrize("script_name", SCRIPTS)
-def test_table_argument_usage(script_name):
+def test_table_argument_usage(script_name, run_script):
     """Test that --table argument works with custom value"""
-    result = subprocess.run(
-        ["python", script_name, "--table", "test_table", "--help"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
+    exit_code, _ = run_script(script_name, "--table", "test_table", "--help")
 
     # Help should work even with --table argument
-    assert result.returncode == 0, f"{script_name}: --table argument breaks help"
+    assert exit_code == 0, f"{script_name}: --table argument breaks help"
 
 
 def test_export_generates_same_format():
     """Test that export_for_neo4j.py generates expected JSON format"""
     result = subprocess.run(
         [
-            "python",
+            sys.executable,
             "export_for_neo4j.py",
             "--table",
             "whiskey_jack",
@@ -90,20 +83,15 @@ def test_export_generates_same_format():
                 assert field in first_value, f"Missing required field: {field}"
 
 
-def test_streamlit_browser_table_support():
+def test_streamlit_browser_table_support(script_help):
     """Test that Streamlit browser help shows --table argument"""
-    result = subprocess.run(
-        ["python", "lancedb_data_browser.py", "--help"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
+    exit_code, help_text = script_help("lancedb_data_browser.py")
 
-    assert result.returncode == 0, "Streamlit browser help failed"
-    assert "--table" in result.stdout, "Streamlit browser missing --table argument"
+    assert exit_code == 0, "Streamlit browser help failed"
+    assert "--table" in help_text, "Streamlit browser missing --table argument"
 
 
-def test_table_switching_integration():
+def test_table_switching_integration(run_script):
     """Integration test: Scripts work with custom table argument"""
     scripts_to_test = [
         "export_for_neo4j.py",
@@ -111,13 +99,8 @@ def test_table_switching_integration():
     ]
 
     for script in scripts_to_test:
-        result = subprocess.run(
-            ["python", script, "--table", "whiskey_jack", "--help"],
-            capture_output=True,
-            text=True,
-            timeout=15,
-        )
+        exit_code, help_text = run_script(script, "--table", "whiskey_jack", "--help")
 
         # Help should work with --table argument
-        assert result.returncode == 0, f"{script}: --table breaks help command"
-        assert "table" in result.stdout.lower(), f"{script}: Help doesn't mention table"
+        assert exit_code == 0, f"{script}: --table breaks help command"
+        assert "table" in help_text.lower(), f"{script}: Help doesn't mention table"
@@ -5,84 +5,64 @@ Tests that scripts accept --table argument and maintain backward compatibility.
 """
 
 import subprocess
+import sys
 import os
 
+import pytest
 
+
+@pytest.mark.xdist_group(name="help_checks")
 class TestConfigurableTableNames:
     """Test that LanceDB scripts accept configurable table names."""
 
-    def test_export_for_neo4j_default_table(self):
+    def test_export_for_neo4j_default_table(self, script_help):
         """Test export_for_neo4j.py uses whiskey_jack by default (backward compatibility)."""
         # This test expects the script to fail gracefully if whiskey_jack table doesn't exist
         # but should show the --table option in help
-        result = subprocess.run(
-            ["python", "export_for_neo4j.py", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=".",
-        )
-        assert result.returncode == 0
-        assert "--table" in result.stdout
-        assert "whiskey_jack" in result.stdout.lower()
+        exit_code, help_text = script_help("export_for_neo4j.py")
+        assert exit_code == 0
+        assert "--table" in help_text
+        assert "whiskey_jack" in help_text.lower()
 
-    def test_export_for_neo4j_custom_table_argument(self):
+    def test_export_for_neo4j_custom_table_argument(self, run_script):
         """Test export_for_neo4j.py accepts --table argument."""
-        result = subprocess.run(
-            ["python", "export_for_neo4j.py", "--table", "test_table", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=".",
+        exit_code, help_text = run_script(
+            "export_for_neo4j.py", "--table", "test_table", "--help"
         )
-        assert result.returncode == 0
-        assert "--table" in result.stdout
+        assert exit_code == 0
+        assert "--table" in help_text
 
-    def test_lancedb_data_dump_default_table(self):
+    def test_lancedb_data_dump_default_table(self, script_help):
         """Test lancedb_data_dump.py uses whiskey_jack by default."""
-        result = subprocess.run(
-            ["python", "lancedb_data_dump.py", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=".",
-        )
-        assert result.returncode == 0
-        assert "--table" in result.stdout
-        assert "whiskey_jack" in result.stdout.lower()
+        exit_code, help_text = script_help("lancedb_data_dump.py")
+        assert exit_code == 0
+        assert "--table" in help_text
+        assert "whiskey_jack" in help_text.lower()
 
-    def test_lancedb_data_dump_custom_table_argument(self):
+    def test_lancedb_data_dump_custom_table_argument(self, run_script):
         """Test lancedb_data_dump.py accepts --table argument."""
-        result = subprocess.run(
-            ["python", "lancedb_data_dump.py", "--table", "test_table", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=".",
+        exit_code, help_text = run_script(
+            "lancedb_data_dump.py", "--table", "test_table", "--help"
         )
-        assert result.returncode == 0
-        assert "--table" in result.stdout
+        assert exit_code == 0
+        assert "--table" in help_text
 
-    def test_whiskey_jack_eda_default_table(self):
+    def test_whiskey_jack_eda_default_table(self, script_help):
         """Test whiskey_jack_eda.py uses whiskey_jack by default."""
-        result = subprocess.run(
-            ["python", "whiskey_jack_eda.py", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=".",
-        )
-        assert result.returncode == 0
-        assert "--table" in result.stdout
-        assert "whiskey_jack" in result.stdout.lower()
+        exit_code, help_text = script_help("whiskey_jack_eda.py")
+        assert exit_code == 0
+        assert "--table" in help_text
+        assert "whiskey_jack" in help_text.lower()
 
-    def test_whiskey_jack_eda_custom_table_argument(self):
+    def test_whiskey_jack_eda_custom_table_argument(self, run_script):
         """Test whiskey_jack_eda.py accepts --table argument."""
-        result = subprocess.run(
-            ["python", "whiskey_jack_eda.py", "--table", "test_table", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=".",
+        exit_code, help_text = run_script(
+            "whiskey_jack_eda.py", "--table", "test_table", "--help"
         )
-        assert result.returncode == 0
-        assert "--table" in result.stdout
+        assert exit_code == 0
+        assert "--table" in help_text
 
-    def test_all_scripts_have_table_argument(self):
+    def test_all_scripts_have_table_argument(self, script_help):
         """Test that all major LanceDB scripts support --table argument."""
         scripts = [
             "export_for_neo4j.py",
@@ -96,16 +76,9 @@ class TestConfigurableTableNames:
 
         for script in scripts:
             if os.path.exists(script):
-                result = subprocess.run(
-                    ["python", script, "--help"],
-                    capture_output=True,
-                    text=True,
-                    cwd=".",
-                )
-                assert result.returncode == 0, f"{script} should show help"
-                assert "--table" in result.stdout, (
-                    f"{script} should have --table argument"
-                )
+                exit_code, help_text = script_help(script)
+                assert exit_code == 0, f"{script} should show help"
+                assert "--table" in help_text, f"{script} should have --table argument"
 
     def test_backward_compatibility_no_arguments(self):
         """Test scripts work without any arguments (backward compatibility)."""
@@ -116,7 +89,7 @@ class TestConfigurableTableNames:
         for script in scripts:
             if os.path.exists(script):
                 result = subprocess.run(
-                    ["python", script],
+                    [sys.executable, script],
                     capture_output=True,
                     text=True,
                     cwd=".",
@@ -5,17 +5,14 @@ Consolidates all EDA approaches into a single, definitive analysis
 """
 
 import argparse
+import glob
+import hashlib
+import os
 import lancedb
 import duckdb
+import pyarrow.parquet as pq
 
-# Try to import pandas for enhanced analysis, but work without it if needed
-try:
-    import pandas as pd
-
-    HAS_PANDAS = True
-except ImportError:
-    print("Note: pandas not available, using basic analysis")
-    HAS_PANDAS = False
+from lance_utils import WORD_PATTERN
 
 
 def main():
@@ -40,6 +37,11 @@ Examples:
         default=".",
         help="Directory containing LanceDB data (default: current directory)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always rebuild the session statistics instead of reusing the cached copy",
+    )
     args = parser.parse_args()
 
     print(f"🔍 Comprehensive EDA - {args.table} LanceDB Table")
@@ -62,27 +64,90 @@ Examples:
     for field in field_names:
         print(f"  - {field}")
 
-    # Convert to Lance format for DuckDB
-    whiskey_table = table.to_lance()
+    # Register the Lance dataset once on a dedicated connection for all queries
+    con = duckdb.connect()
+    con.register("whiskey_table", table.to_lance())
+
+    # IMPORTANT: Group by both session_id AND run_id for accurate reconstruction.
+    # A session's text is its chunks joined by single spaces, so its length
+    # and word count are sums over the chunks and the text is never built.
+    session_sql = """
+    SELECT 
+        session_id,
+        run_id,
+        CAST(SUM(LENGTH(text)) + COUNT(text) - 1 AS BIGINT) as char_count,
+        CAST(SUM(len(regexp_extract_all(text, $word_pattern))) AS BIGINT) as word_count,
+        COUNT(*) as chunk_count,
+        MIN(timestamp) as first_timestamp
+    FROM whiskey_table
+    GROUP BY 
+        session_id, run_id
+    """
 
-    # Basic statistics using DuckDB
+    # Session statistics are cached per table version as Parquet, so running
+    # the EDA again on an unchanged table skips the full aggregation
+    cache_dir = os.path.join(args.data_dir, ".cache")
+    cache_key = hashlib.sha256(
+        f"{os.path.abspath(args.data_dir)}/{args.table}/{table.version}/"
+        f"{total_chunks}/{session_sql}/{WORD_PATTERN}".encode()
+    ).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, f"eda_{args.table}_{cache_key}.parquet")
+
+    if not args.no_cache and os.path.exists(cache_path):
+        session_source = (
+            "♻️  Table unchanged since the last run, reusing cached sessions..."
+        )
+        session_stats = pq.read_table(cache_path)
+    else:
+        session_source = "Aggregating chunks into complete sessions..."
+        session_stats = con.execute(session_sql, {"word_pattern": WORD_PATTERN}).arrow()
+
+        if not args.no_cache:
+            # Keep only the copy for the current table version; write under a
+            # temporary name so an interrupted run never leaves a partial file.
+            # The cache is optional: a read-only case directory only loses it.
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                for stale in glob.glob(
+                    os.path.join(cache_dir, f"eda_{args.table}_*.parquet")
+                ):
+                    os.remove(stale)
+                pq.write_table(session_stats, cache_path + ".tmp", compression="zstd")
+                os.replace(cache_path + ".tmp", cache_path)
+            except OSError as e:
+                print(f"⚠️  Could not cache session statistics: {e}")
+                if os.path.exists(cache_path + ".tmp"):
+                    os.remove(cache_path + ".tmp")
+
+    con.register("session_stats", session_stats)
+
+    # Basic statistics using DuckDB. Session and run counts come from the
+    # per-session table above, so only the chunk lengths scan the chunks again
     print("\n📈 CHUNK-LEVEL STATISTICS")
     print("-" * 50)
 
     stats_sql = """
     SELECT 
-        COUNT(DISTINCT session_id) as unique_sessions,
-        COUNT(DISTINCT run_id) as unique_runs,
-        COUNT(DISTINCT CONCAT(session_id, '|', run_id)) as unique_session_runs,
-        COUNT(*) as total_chunks,
-        AVG(LENGTH(text)) as avg_chunk_length,
-        MIN(LENGTH(text)) as min_chunk_length,
-        MAX(LENGTH(text)) as max_chunk_length,
-        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY LENGTH(text)) as median_chunk_length
-    FROM whiskey_table
+        sessions.*,
+        chunks.*
+    FROM (
+        SELECT 
+            COUNT(DISTINCT session_id) as unique_sessions,
+            COUNT(DISTINCT run_id) as unique_runs,
+            COUNT(*) as unique_session_runs,
+            CAST(SUM(chunk_count) AS BIGINT) as total_chunks
+        FROM session_stats
+    ) sessions, (
+        SELECT 
+            AVG(LENGTH(text)) as avg_chunk_length,
+            MIN(LENGTH(text)) as min_chunk_length,
+            MAX(LENGTH(text)) as max_chunk_length,
+            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY LENGTH(text)) as median_chunk_length
+        FROM whiskey_table
+    ) chunks
     """
 
-    stats = duckdb.query(stats_sql).fetchone()
+    stats = con.execute(stats_sql).fetchone()
     print(f"Unique session IDs: {stats[0]:,}")
     print(f"Unique run IDs: {stats[1]:,}")
     print(f"Unique session-run combinations: {stats[2]:,}")
@@ -96,103 +161,63 @@ Examples:
     print("\nChunks per session distribution:")
     chunk_dist_sql = """
     SELECT 
-        chunks_per_session,
+        chunk_count as chunks_per_session,
         COUNT(*) as session_count
-    FROM (
-        SELECT 
-            CONCAT(session_id, '|', run_id) as session_run,
-            COUNT(*) as chunks_per_session
-        FROM whiskey_table
-        GROUP BY session_id, run_id
-    )
-    GROUP BY chunks_per_session
-    ORDER BY chunks_per_session
+    FROM session_stats
+    GROUP BY chunk_count
+    ORDER BY chunk_count
     """
 
-    chunk_dist = duckdb.query(chunk_dist_sql).fetchall()
+    chunk_dist = con.execute(chunk_dist_sql).fetchall()
     total_sessions = sum(count for _, count in chunk_dist)
-    for chunks, count in chunk_dist[:10]:  # Show first 10
-        pct = count / total_sessions * 100
-        print(
-            f"  {chunks} chunk{'s' if chunks > 1 else ''}: {count} sessions ({pct:.1f}%)"
+    print(
+        "\n".join(
+            f"  {chunks} chunk{'s' if chunks > 1 else ''}: {count} sessions "
+            f"({count / total_sessions * 100:.1f}%)"
+            for chunks, count in chunk_dist[:10]  # Show first 10
         )
+    )
 
     # Reconstruct full sessions
     print("\n🔄 FULL SESSION RECONSTRUCTION")
     print("-" * 50)
-    print("Aggregating chunks into complete sessions...")
-
-    # IMPORTANT: Group by both session_id AND run_id for accurate reconstruction
-    session_sql = """
-    SELECT 
-        session_id,
-        run_id,
-        STRING_AGG(text, ' ') as full_text,
-        COUNT(*) as chunk_count,
-        MIN(timestamp) as first_timestamp,
-        MAX(timestamp) as last_timestamp,
-        STRING_AGG(content_type, ', ') as content_types
-    FROM 
-        (SELECT * FROM whiskey_table ORDER BY timestamp, chunk_id ASC) 
-    GROUP BY 
-        session_id, run_id
-    ORDER BY 
-        MIN(timestamp)
-    """
-
-    sessions = duckdb.query(session_sql).fetchall()
-    print(f"✓ Reconstructed {len(sessions):,} complete sessions")
+    print(session_source)
+    print(f"✓ Reconstructed {session_stats.num_rows:,} complete sessions")
 
     # Analyze sessions
     print("\n📝 SESSION-LEVEL ANALYSIS")
     print("-" * 50)
 
-    # Process all sessions
-    session_stats = []
-    very_short = []  # <20 words
-    short = []  # 20-50 words
-    medium = []  # 50-200 words
-    long = []  # >200 words
-
-    total_words = 0
-    total_chars = 0
-
-    for session in sessions:
-        session_id, run_id, full_text, chunk_count, first_ts, last_ts, content_types = (
-            session
-        )
+    # Categorize by word count; the rollup row (category NULL) has the totals
+    category_sql = """
+    SELECT 
+        CASE 
+            WHEN word_count < 20 THEN 'very_short'
+            WHEN word_count < 50 THEN 'short'
+            WHEN word_count < 200 THEN 'medium'
+            ELSE 'long'
+        END as category,
+        COUNT(*) as session_count,
+        SUM(word_count) as word_count,
+        SUM(char_count) as char_count,
+        COUNT(*) FILTER (WHERE chunk_count = 1) as single_chunk_sessions
+    FROM session_stats
+    GROUP BY ROLLUP (category)
+    """
 
-        char_count = len(full_text)
-        word_count = len(full_text.split())
-
-        total_words += word_count
-        total_chars += char_count
-
-        session_data = {
-            "session_id": session_id,
-            "run_id": run_id,
-            "word_count": word_count,
-            "char_count": char_count,
-            "chunk_count": chunk_count,
-            "text_preview": full_text[:200],
-        }
-
-        # Categorize by word count
-        if word_count < 20:
-            very_short.append(session_data)
-        elif word_count < 50:
-            short.append(session_data)
-        elif word_count < 200:
-            medium.append(session_data)
-        else:
-            long.append(session_data)
-
-        session_stats.append(session_data)
+    categories = {
+        category: counts for category, *counts in con.execute(category_sql).fetchall()
+    }
+    session_count, total_words, total_chars, single_chunk_sessions = categories[None]
+    very_short_count, very_short_words = categories.get("very_short", (0, 0))[:2]
+    short_count, short_words = categories.get("short", (0, 0))[:2]
+    medium_count, medium_words = categories.get("medium", (0, 0))[:2]
+    long_count, long_words = categories.get("long", (0, 0))[:2]
 
     # Calculate statistics
-    avg_words = total_words / len(sessions) if sessions else 0
-    avg_chars = total_chars / len(sessions) if sessions else 0
-    avg_chunks = total_chunks / len(sessions) if sessions else 0
+    avg_words = total_words / session_count if session_count else 0
+    avg_chars = total_chars / session_count if session_count else 0
+    avg_chunks = total_chunks / session_count if session_count else 0
 
     print(f"Average session length: {avg_chars:.0f} characters, {avg_words:.0f} words")
     print(f"Average chunks per session: {avg_chunks:.1f}")
@@ -202,26 +227,44 @@ Examples:
     print("\n📱 CONTENT TYPE ANALYSIS")
     print("-" * 50)
     print(
-        f"Very short (<20 words) - Text messages: {len(very_short):,} ({len(very_short) / len(sessions) * 100:.1f}%)"
+        f"Very short (<20 words) - Text messages: {very_short_count:,} ({very_short_count / session_count * 100:.1f}%)"
     )
     print(
-        f"Short (20-50 words) - Short texts/calls: {len(short):,} ({len(short) / len(sessions) * 100:.1f}%)"
+        f"Short (20-50 words) - Short texts/calls: {short_count:,} ({short_count / session_count * 100:.1f}%)"
     )
     print(
-        f"Medium (50-200 words) - Brief conversations: {len(medium):,} ({len(medium) / len(sessions) * 100:.1f}%)"
+        f"Medium (50-200 words) - Brief conversations: {medium_count:,} ({medium_count / session_count * 100:.1f}%)"
     )
     print(
-        f"Long (>200 words) - Phone calls: {len(long):,} ({len(long) / len(sessions) * 100:.1f}%)"
+        f"Long (>200 words) - Phone calls: {long_count:,} ({long_count / session_count * 100:.1f}%)"
     )
 
     # Show examples
     print("\n💬 SAMPLE TEXT MESSAGES (Very Short Sessions)")
     print("-" * 50)
-    for i, session in enumerate(very_short[:5]):
-        print(
-            f"\nExample {i + 1} - Session {session['session_id'][:8]}... ({session['word_count']} words):"
-        )
-        text = session["text_preview"].strip()
+    # Only the five sessions shown are rebuilt as text, in chunk order
+    example_sql = """
+    WITH examples AS (
+        SELECT session_id, run_id, word_count, first_timestamp
+        FROM session_stats
+        WHERE word_count < 20
+        ORDER BY first_timestamp, session_id, run_id
+        LIMIT 5
+    )
+    SELECT 
+        e.session_id,
+        e.word_count,
+        LEFT(STRING_AGG(w.text, ' ' ORDER BY w.timestamp, w.chunk_id), 200) as text_preview
+    FROM examples e
+    JOIN whiskey_table w ON w.session_id = e.session_id AND w.run_id = e.run_id
+    GROUP BY e.session_id, e.run_id, e.word_count, e.first_timestamp
+    ORDER BY e.first_timestamp, e.session_id, e.run_id
+    """
+
+    examples = con.execute(example_sql).fetchall()
+    for i, (session_id, word_count, text_preview) in enumerate(examples):
+        print(f"\nExample {i + 1} - Session {session_id[:8]}... ({word_count} words):")
+        text = text_preview.strip()
         if len(text) > 150:
             text = text[:150] + "..."
         print(f'  "{text}"')
@@ -230,11 +273,6 @@ Examples:
     print("\n📊 WORD DISTRIBUTION BY CONTENT TYPE")
     print("-" * 50)
 
-    very_short_words = sum(s["word_count"] for s in very_short)
-    short_words = sum(s["word_count"] for s in short)
-    medium_words = sum(s["word_count"] for s in medium)
-    long_words = sum(s["word_count"] for s in long)
-
     print(
         f"Text messages: {very_short_words:,} words ({very_short_words / total_words * 100:.1f}% of total)"
     )
@@ -248,21 +286,31 @@ Examples:
         f"Phone calls: {long_words:,} words ({long_words / total_words * 100:.1f}% of total)"
     )
 
-    # Advanced statistics if pandas available
-    if HAS_PANDAS and session_stats:
-        print("\n📊 DETAILED STATISTICS (with pandas)")
+    # Distribution statistics, computed where the word counts already are
+    if session_count:
+        print("\n📊 DETAILED STATISTICS")
         print("-" * 50)
 
-        df = pd.DataFrame(session_stats)
+        percentiles = [10, 25, 50, 75, 90, 95, 99]
+        # Sample statistics, NaN for a single session, as pandas reported them
+        distribution_sql = """
+        SELECT 
+            quantile_cont(word_count, $fractions) as percentiles,
+            COALESCE(stddev_samp(word_count), 'NaN') as std,
+            COALESCE(var_samp(word_count), 'NaN') as variance
+        FROM session_stats
+        """
+
+        values, std, variance = con.execute(
+            distribution_sql, {"fractions": [p / 100 for p in percentiles]}
+        ).fetchone()
 
         print("\nWord count percentiles:")
-        percentiles = [10, 25, 50, 75, 90, 95, 99]
-        for p in percentiles:
-            val = df["word_count"].quantile(p / 100)
+        for p, val in zip(percentiles, values):
             print(f"  {p}th percentile: {val:.0f} words")
 
-        print(f"\nStandard deviation: {df['word_count'].std():.1f} words")
-        print(f"Variance: {df['word_count'].var():.1f}")
+        print(f"\nStandard deviation: {std:.1f} words")
+        print(f"Variance: {variance:.1f}")
 
     # Key insights and summary
     print("\n🔍 KEY INSIGHTS & SUMMARY")
@@ -270,10 +318,10 @@ Examples:
 
     # Call duration estimates
     avg_call_duration = avg_words / 150  # 150 words/minute
-    long_call_avg = sum(s["word_count"] for s in long) / len(long) if long else 0
+    long_call_avg = long_words / long_count if long_count else 0
     long_call_duration = long_call_avg / 150
 
-    print(f"• Dataset contains {len(sessions):,} sessions from {total_chunks:,} chunks")
+    print(f"• Dataset contains {session_count:,} sessions from {total_chunks:,} chunks")
     print(
         f"• Average session: {avg_words:.0f} words ({avg_call_duration:.1f} minutes @ 150 wpm)"
     )
@@ -283,11 +331,11 @@ Examples:
 
     print("\n• Content breakdown:")
     print(
-        f"  - {len(very_short) / len(sessions) * 100:.0f}% are text messages (<20 words)"
+        f"  - {very_short_count / session_count * 100:.0f}% are text messages (<20 words)"
     )
-    print(f"  - {len(long) / len(sessions) * 100:.0f}% are phone calls (>200 words)")
+    print(f"  - {long_count / session_count * 100:.0f}% are phone calls (>200 words)")
     print(
-        f"  - {(len(short) + len(medium)) / len(sessions) * 100:.0f}% are short calls/mixed content"
+        f"  - {(short_count + medium_count) / session_count * 100:.0f}% are short calls/mixed content"
     )
 
     print("\n• Volume metrics:")
@@ -295,16 +343,16 @@ Examples:
         f"  - Total: {total_words:,} words (~{total_words / 250:.0f} pages @ 250 words/page)"
     )
     print(
-        f"  - Text messages: {very_short_words / total_words * 100:.0f}% of words despite being {len(very_short) / len(sessions) * 100:.0f}% of sessions"
+        f"  - Text messages: {very_short_words / total_words * 100:.0f}% of words despite being {very_short_count / session_count * 100:.0f}% of sessions"
     )
     print(
-        f"  - Phone calls: {long_words / total_words * 100:.0f}% of words from just {len(long) / len(sessions) * 100:.0f}% of sessions"
+        f"  - Phone calls: {long_words / total_words * 100:.0f}% of words from just {long_count / session_count * 100:.0f}% of sessions"
     )
 
     print("\n• Chunking efficiency:")
     print(f"  - Average {avg_chunks:.1f} chunks per session")
     print(
-        f"  - {sum(1 for s in session_stats if s['chunk_count'] == 1) / len(sessions) * 100:.0f}% of sessions fit in a single chunk"
+        f"  - {single_chunk_sessions / session_count * 100:.0f}% of sessions fit in a single chunk"
     )
     print("  - Using multilingual-e5-large-instruct embeddings (512 token window)")
 
@@ -313,7 +361,7 @@ Examples:
     print("-" * 50)
     print("• Timestamps appear to be Unix epoch (1970-01-01) - may need conversion")
     print("• Multiple run_ids per session_id suggest multiple processing runs")
-    print(f"• Unique session-run combinations: {len(sessions):,}")
+    print(f"• Unique session-run combinations: {session_count:,}")
 
     print("\n✅ Analysis Complete!")
 